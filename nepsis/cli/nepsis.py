@@ -2,17 +2,43 @@
 
 import argparse
 import json
+import os
+import sys
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 from typing import Any, Dict, List
 
 from nepsis.core import (
+    CORPORA,
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_CHUNK_SIZES,
+    DEFAULT_CORPUS_SIZE,
+    DEFAULT_MMAP_WINDOW,
+    DEFAULT_REPEAT,
+    DEFAULT_SHARD_SIZE,
+    DEFAULT_TEST_TIMEOUT,
+    DEFAULT_TIME_BUDGET,
     BlueChannel,
     CollapseGovernor,
     ConditionSpec,
     ExperimentRunner,
+    GROUP_COLUMNS,
+    RESULTS_STORE_FILENAME,
+    NormalizeStats,
     RedChannel,
+    ResultsStore,
     StillLogger,
     ZeroBackController,
+    build_still_index,
+    discover_candidates,
+    load_normalizer,
+    normalize_file_mmap,
+    normalize_parallel,
+    normalize_stream,
+    read_still_log,
+    run_benchmarks,
+    write_reports,
 )
 
 
@@ -28,27 +54,27 @@ def run_scenario(args: argparse.Namespace) -> None:
     red = RedChannel()
     blue = BlueChannel()
     governor = CollapseGovernor()
-    still = StillLogger(Path(args.still_log))
+    still = StillLogger(Path(args.still_log), structured=True)
     zero_back = ZeroBackController()
+    scenario = str(signal.get("id") or Path(args.signal).stem)
 
-    still.log("start scenario")
+    still.record("start", scenario)
 
     hijack_score, promote = blue.analyze(signal)
-    still.log(f"blue-channel hijack={hijack_score:.2f} promote={promote}")
+    still.record("blue-channel", scenario, hijack_score=round(hijack_score, 4), promote=promote)
 
     if promote:
-        still.log("promotion to red channel")
+        still.record("promotion", scenario, channel="red")
     red_trigger = red.evaluate(signal) or promote
 
-    mode = governor.select(
-        contradiction_density=float(signal.get("contradiction", 0.0)),
-        interpretant_coherence=float(signal.get("coherence", 1.0)),
-    )
-    still.log(f"collapse-mode {mode}")
+    contradiction = float(signal.get("contradiction", 0.0))
+    coherence = float(signal.get("coherence", 1.0))
+    mode = governor.select(contradiction_density=contradiction, interpretant_coherence=coherence)
+    still.record("collapse-mode", scenario, mode=mode, contradiction=contradiction, coherence=coherence)
 
     if red_trigger:
         zero_back.reset("red-triggered")
-        still.log("zero-back engaged")
+        still.record("zero-back", scenario, depth=len(zero_back.history))
 
     print(
         f"mode={mode} red_trigger={red_trigger} hijack_score={hijack_score:.2f} "
@@ -56,8 +82,28 @@ def run_scenario(args: argparse.Namespace) -> None:
     )
 
 
-def audit_log(_: argparse.Namespace) -> None:
-    print("audit log not yet implemented")
+def _utc_ns(value: str) -> int:
+    moment = datetime.fromisoformat(value.rstrip("Z"))
+    if moment.tzinfo is None:  # STILL timestamps are UTC
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1_000_000) * 1000
+
+
+def audit_log(args: argparse.Namespace) -> None:
+    path = Path(args.still_log)
+    if not path.exists():
+        raise SystemExit(f"no STILL log at {path}")
+    if args.reindex:
+        print(f"indexed {build_still_index(path)} records", file=sys.stderr)
+    records = read_still_log(
+        path,
+        start=_utc_ns(args.since) if args.since else None,
+        end=_utc_ns(args.until) if args.until else None,
+        events=args.event,
+        scenario=args.scenario,
+    )
+    for record in islice(records, args.limit or None):
+        sys.stdout.write(json.dumps(record) + "\n")
 
 
 def zero_back(_: argparse.Namespace) -> None:
@@ -75,8 +121,21 @@ def run_experiment(args: argparse.Namespace) -> None:
         workspace=workspace,
         tests_path=tests_path,
         artifacts_path=artifacts_path,
+        max_workers=args.jobs,
+        in_process=args.in_process,
+        test_timeout=args.test_timeout,
+        benchmark=not args.no_benchmark,
+        cache=not args.no_cache,
     )
 
+    if args.candidates:
+        conditions = discover_candidates((workspace / args.candidates).resolve(), workspace / "prompts")
+        if not conditions:
+            raise SystemExit(f"no candidate *.py files under {args.candidates}")
+        summary = runner.run(conditions, model_name=args.model_name, notes=args.notes, trials=args.trials)
+        print(json.dumps(summary["statistics"], indent=2))
+        return
+
     conditions: List[ConditionSpec] = [
         ConditionSpec(
             name="naked",
@@ -90,8 +149,118 @@ def run_experiment(args: argparse.Namespace) -> None:
         ),
     ]
 
-    summary = runner.run(conditions, model_name=args.model_name, notes=args.notes)
-    print(json.dumps(summary, indent=2))
+    summary = runner.run(conditions, model_name=args.model_name, notes=args.notes, trials=args.trials)
+    if args.trials == 1:
+        print(json.dumps(dict(summary, conditions=list(summary["conditions"])), indent=2))
+    else:
+        print(json.dumps(summary["statistics"], indent=2))
+
+
+def results(args: argparse.Namespace) -> None:
+    store_path = (Path(args.workspace) / args.artifacts / RESULTS_STORE_FILENAME).resolve()
+    if not store_path.exists():
+        raise SystemExit(f"no results store at {store_path}; run run-experiment first")
+    since = datetime.fromisoformat(args.since).timestamp() if args.since else None
+    with ResultsStore(store_path) as store:
+        if args.throughput:
+            rows = store.throughput_trend(model_name=args.model, condition=args.condition, since=since)
+        else:
+            rows = store.pass_rates(
+                group_by=args.by or ("model_name", "condition"),
+                model_name=args.model,
+                condition=args.condition,
+                since=since,
+            )
+    print(json.dumps(rows, indent=2))
+
+
+def report(args: argparse.Namespace) -> None:
+    artifacts_path = (Path(args.workspace) / args.artifacts).resolve()
+    summary = write_reports(artifacts_path)
+    print(json.dumps(summary["statistics"], indent=2))
+
+
+def normalize(args: argparse.Namespace) -> None:
+    normalizer_cls = load_normalizer(Path(args.solution))
+    if args.mmap or args.workers > 1:
+        if args.input == "-" or args.output == "-":
+            raise SystemExit("--mmap/--workers need an input file and an --output file")
+        errors_sink = open(args.errors, "w", encoding="utf-8") if args.errors else None
+        try:
+            if args.workers > 1:
+                stats = normalize_parallel(
+                    Path(args.input),
+                    Path(args.output),
+                    Path(args.solution),
+                    workers=args.workers,
+                    shard_size=args.shard_size,
+                    errors_sink=errors_sink,
+                )
+            else:
+                stats = normalize_file_mmap(
+                    Path(args.input),
+                    Path(args.output),
+                    normalizer_cls,
+                    window=args.window,
+                    errors_sink=errors_sink,
+                )
+        finally:
+            if errors_sink is not None:
+                errors_sink.close()
+        _report_normalize(stats)
+        return
+
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    sink = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    errors_sink = open(args.errors, "w", encoding="utf-8") if args.errors else None
+    try:
+        stats = normalize_stream(
+            source,
+            sink,
+            normalizer_cls,
+            block_size=args.block_size,
+            errors_sink=errors_sink,
+        )
+    finally:
+        for handle in (source, sink, errors_sink):
+            if handle is not None and handle not in (sys.stdin.buffer, sys.stdout.buffer):
+                handle.close()
+    _report_normalize(stats)
+
+
+def _report_normalize(stats: NormalizeStats) -> None:
+    # stdout may carry the normalized text, so the report goes to stderr
+    print(
+        f"normalized {stats.bytes_in} bytes -> {stats.bytes_out} bytes, "
+        f"{stats.errors} error spans, {stats.mb_per_s:.2f} MB/s",
+        file=sys.stderr,
+    )
+
+
+def benchmark(args: argparse.Namespace) -> None:
+    solutions = args.solutions or [
+        name for name in ("solution.py", "solution_naked.py", "solution_scaffold.py") if Path(name).exists()
+    ]
+    report = run_benchmarks(
+        [Path(solution) for solution in solutions],
+        corpora=args.corpus or None,
+        chunk_sizes=args.chunk_size or None,
+        size=args.size,
+        repeat=args.repeat,
+        seed=args.seed,
+        time_budget=args.time_budget,
+    )
+    payload = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(payload)
+    else:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    for result in report["results"]:
+        status = result["error"] or (
+            f"{result['mb_per_s']:.2f} MB/s, {result['ns_per_byte']:.1f} ns/byte, "
+            f"p99 push {result['push_p99_ns'] / 1000:.1f} us, peak {result['peak_bytes']} B"
+        )
+        print(f"{result['solution']} {result['corpus']} chunk={result['chunk_size']}: {status}", file=sys.stderr)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -105,12 +274,85 @@ def build_parser() -> argparse.ArgumentParser:
     )
     run_parser.set_defaults(func=run_scenario)
 
-    audit_parser = subparsers.add_parser("audit-log", help="Display collected audit log")
+    audit_parser = subparsers.add_parser(
+        "audit-log", help="Stream STILL log records (JSONL) filtered by time range, event type and scenario"
+    )
+    audit_parser.add_argument("--still-log", default="logs/still.log", help="STILL log to read")
+    audit_parser.add_argument("--since", default="", help="Earliest record time, ISO 8601 (UTC if naive)")
+    audit_parser.add_argument("--until", default="", help="Latest record time, ISO 8601 (UTC if naive)")
+    audit_parser.add_argument(
+        "--event", action="append", help="Only this event type, e.g. collapse-mode (repeatable)"
+    )
+    audit_parser.add_argument("--scenario", default=None, help="Only records of this scenario id")
+    audit_parser.add_argument("--limit", type=int, default=0, help="Stop after this many records")
+    audit_parser.add_argument(
+        "--reindex", action="store_true", help="Rebuild the sidecar index from the log before reading"
+    )
     audit_parser.set_defaults(func=audit_log)
 
     zero_back_parser = subparsers.add_parser("zero-back", help="Trigger a zero-back reset")
     zero_back_parser.set_defaults(func=zero_back)
 
+    normalize_parser = subparsers.add_parser(
+        "normalize", help="Stream a file or stdin through a Utf8StreamNormalizer"
+    )
+    normalize_parser.add_argument("input", nargs="?", default="-", help="Input path (- for stdin)")
+    normalize_parser.add_argument(
+        "-o", "--output", default="-", help="Output path for normalized UTF-8 (- for stdout)"
+    )
+    normalize_parser.add_argument(
+        "--errors", default="", help="Optional JSONL sidecar receiving error spans"
+    )
+    normalize_parser.add_argument(
+        "--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Read size in bytes"
+    )
+    normalize_parser.add_argument(
+        "--solution", default="solution_scaffold.py", help="Solution file providing the normalizer"
+    )
+    normalize_parser.add_argument(
+        "--mmap", action="store_true", help="Memory-map the input file instead of reading blocks"
+    )
+    normalize_parser.add_argument(
+        "--window", type=int, default=DEFAULT_MMAP_WINDOW, help="Window size in bytes for --mmap"
+    )
+    normalize_parser.add_argument(
+        "--workers", type=int, default=1, help="Normalize shards of the input file on N processes"
+    )
+    normalize_parser.add_argument(
+        "--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Target shard size in bytes for --workers"
+    )
+    normalize_parser.set_defaults(func=normalize)
+
+    benchmark_parser = subparsers.add_parser(
+        "benchmark", help="Measure throughput, latency and memory of normalizer solutions"
+    )
+    benchmark_parser.add_argument(
+        "solutions", nargs="*", help="Solution files (default: solution*.py in the current directory)"
+    )
+    benchmark_parser.add_argument(
+        "--corpus", action="append", choices=sorted(CORPORA), help="Corpus to run (repeatable, default: all)"
+    )
+    benchmark_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        action="append",
+        help=f"Push size in bytes (repeatable, default: {', '.join(map(str, DEFAULT_CHUNK_SIZES))})",
+    )
+    benchmark_parser.add_argument(
+        "--size", type=int, default=DEFAULT_CORPUS_SIZE, help="Corpus size in bytes"
+    )
+    benchmark_parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_REPEAT, help="Timed passes per measurement (best is kept)"
+    )
+    benchmark_parser.add_argument(
+        "--time-budget", type=float, default=DEFAULT_TIME_BUDGET, help="Seconds of timed passes per measurement"
+    )
+    benchmark_parser.add_argument("--seed", type=int, default=0, help="Corpus generator seed")
+    benchmark_parser.add_argument(
+        "-o", "--output", default="-", help="Path for the JSON report (- for stdout)"
+    )
+    benchmark_parser.set_defaults(func=benchmark)
+
     experiment_parser = subparsers.add_parser(
         "run-experiment", help="Run naked vs scaffold solutions through pytest evaluator"
     )
@@ -141,8 +383,71 @@ def build_parser() -> argparse.ArgumentParser:
     experiment_parser.add_argument(
         "--notes", default="", help="Optional notes captured in artifacts"
     )
+    experiment_parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1, help="Conditions to evaluate concurrently"
+    )
+    experiment_parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run test functions in forked workers instead of a pytest subprocess per condition",
+    )
+    experiment_parser.add_argument(
+        "--test-timeout",
+        type=float,
+        default=DEFAULT_TEST_TIMEOUT,
+        help="Per-test timeout in seconds for --in-process",
+    )
+    experiment_parser.add_argument(
+        "--trials", type=int, default=1, help="Runs per condition; >1 prints pass-rate/runtime statistics"
+    )
+    experiment_parser.add_argument(
+        "--candidates",
+        default="",
+        help="Directory of candidate solutions to sweep instead of naked/scaffold "
+        "(files in a subdirectory share its name as condition)",
+    )
+    experiment_parser.add_argument(
+        "--no-benchmark", action="store_true", help="Skip the throughput/memory benchmark per run"
+    )
+    experiment_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-run every condition instead of reusing results cached under <artifacts>/cache",
+    )
     experiment_parser.set_defaults(func=run_experiment)
 
+    report_parser = subparsers.add_parser(
+        "report", help="Rebuild automated_results.{json,md} from the appended JSONL results log"
+    )
+    report_parser.add_argument("--workspace", default=".", help="Project workspace root")
+    report_parser.add_argument(
+        "--artifacts", default="artifacts", help="Directory holding automated_results.jsonl"
+    )
+    report_parser.set_defaults(func=report)
+
+    results_parser = subparsers.add_parser(
+        "results", help="Aggregate pass rates or throughput over every run in the results store"
+    )
+    results_parser.add_argument("--workspace", default=".", help="Project workspace root")
+    results_parser.add_argument(
+        "--artifacts", default="artifacts", help=f"Directory holding {RESULTS_STORE_FILENAME}"
+    )
+    results_parser.add_argument(
+        "--by",
+        action="append",
+        choices=GROUP_COLUMNS,
+        help="Group pass rates by this column (repeatable; default: model_name and condition)",
+    )
+    results_parser.add_argument("--model", default=None, help="Only runs recorded with this model name")
+    results_parser.add_argument("--condition", default=None, help="Only this condition")
+    results_parser.add_argument(
+        "--since", default="", help="Only trials recorded at or after this ISO date/time (local time if naive)"
+    )
+    results_parser.add_argument(
+        "--throughput", action="store_true", help="Show mean MB/s, p99 push and peak RSS per run instead"
+    )
+    results_parser.set_defaults(func=results)
+
     return parser
 
 
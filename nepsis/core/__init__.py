@@ -1,8 +1,56 @@
 """Core modules for the Nepsis co-driver."""
 
+from .benchmark import (  # noqa: F401
+    CORPORA,
+    DEFAULT_CHUNK_SIZES,
+    DEFAULT_CORPUS_SIZE,
+    DEFAULT_REPEAT,
+    DEFAULT_TIME_BUDGET,
+    STANDARD_CHUNK_SIZE,
+    STANDARD_CORPORA,
+    STANDARD_CORPUS_SIZE,
+    BenchmarkResult,
+    benchmark_normalizer,
+    build_corpus,
+    run_benchmarks,
+    summarize_benchmark,
+)
 from .blue_channel import BlueChannel  # noqa: F401
+from .cache import DEFAULT_CACHE_BYTES, DEFAULT_CACHE_ENTRIES, ResultCache, cache_key  # noqa: F401
 from .collapse_governor import CollapseGovernor  # noqa: F401
-from .experiment import ConditionSpec, ExperimentRunner  # noqa: F401
+from .experiment import ConditionSpec, ExperimentRunner, discover_candidates, write_reports  # noqa: F401
+from .inprocess import (  # noqa: F401
+    DEFAULT_TEST_TIMEOUT,
+    CaseResult,
+    InProcessResult,
+    run_tests_in_process,
+)
+from .normalize import (  # noqa: F401
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_MMAP_WINDOW,
+    DEFAULT_SHARD_SIZE,
+    NormalizeStats,
+    find_shard_boundary,
+    load_normalizer,
+    load_solution_module,
+    normalize_file_mmap,
+    normalize_parallel,
+    normalize_stream,
+    plan_shards,
+)
+from .normalize_async import AsyncStreamNormalizer  # noqa: F401
 from .red_channel import RedChannel  # noqa: F401
-from .still import StillLogger  # noqa: F401
+from .results import RESULTS_LOG_FILENAME, ResultsLog  # noqa: F401
+from .stats import bootstrap_mean_ci, describe, percentile, summarize_trials  # noqa: F401
+from .store import GROUP_COLUMNS, RESULTS_STORE_FILENAME, ResultsStore  # noqa: F401
+from .still import (  # noqa: F401
+    FSYNC_NEVER,
+    FSYNC_ON_CLOSE,
+    FSYNC_ON_FLUSH,
+    FSYNC_POLICIES,
+    StillLogger,
+    build_still_index,
+    index_path,
+    read_still_log,
+)
 from .zeroback import ZeroBackController  # noqa: F401
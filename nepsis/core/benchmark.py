@@ -0,0 +1,340 @@
+"""Throughput, latency and memory benchmarks for Utf8StreamNormalizer candidates."""
+
+from __future__ import annotations
+
+import gc
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import unicodedata
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .normalize import NormalizerFactory, load_normalizer
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+DEFAULT_CORPUS_SIZE = 1 << 20
+DEFAULT_CHUNK_SIZES = (1, 4, 16, 64, 4096, 1 << 16, 1 << 20)
+DEFAULT_REPEAT = 3
+# Timed passes stop repeating once they have used this many seconds.
+DEFAULT_TIME_BUDGET = 2.0
+# Bytes pushed by the untimed warm-up pass.
+WARMUP_BYTES = 1 << 16
+# Pushes per timed pass are capped so tiny chunk sizes finish in seconds; the
+# pass then covers only the first MAX_PUSHES * chunk_size bytes of the corpus.
+MAX_PUSHES = 1 << 15
+
+# Reduced matrix used to score experiment conditions (see ExperimentRunner).
+STANDARD_CORPORA = ("ascii", "latin1", "cjk", "combining", "corrupt-1")
+STANDARD_CHUNK_SIZE = 4096
+STANDARD_CORPUS_SIZE = 1 << 18
+
+_WORDS = ("the", "quick", "log", "line", "value", "stream", "error", "token", "batch", "commit")
+_LATIN1_WORDS = ("café", "naïve", "Grüße", "São", "façade", "Ærø", "señor", "déjà", "über", "crème")
+
+
+def _ascii_text(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS) + ("\n" if rng.random() < 0.1 else " ")
+        words.append(word)
+        length += len(word)
+    return "".join(words)
+
+
+def _latin1_text(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(_LATIN1_WORDS if rng.random() < 0.6 else _WORDS) + " "
+        words.append(word)
+        length += len(word.encode("utf-8"))
+    return "".join(words)
+
+
+def _cjk_text(rng: random.Random, size: int) -> str:
+    chars = []
+    for _ in range(size // 3 + 1):
+        roll = rng.random()
+        if roll < 0.7:
+            chars.append(chr(rng.randrange(0x4E00, 0x9FFF)))
+        elif roll < 0.95:
+            chars.append(chr(rng.randrange(0x3041, 0x3097)))
+        else:
+            chars.append(rng.choice("。、"))
+    return "".join(chars)
+
+
+def _emoji_text(rng: random.Random, size: int) -> str:
+    pieces = []
+    for _ in range(size // 5 + 1):
+        roll = rng.random()
+        if roll < 0.7:
+            pieces.append(chr(rng.randrange(0x1F300, 0x1F650)))
+        elif roll < 0.85:
+            pieces.append("\U0001F468\u200d\U0001F469\u200d\U0001F467")  # ZWJ family
+        else:
+            pieces.append(" ")
+    return "".join(pieces)
+
+
+def _jamo_text(rng: random.Random, size: int) -> str:
+    # Conjoining jamo L V (T) that NFC must compose into precomposed syllables.
+    pieces = []
+    for _ in range(size // 8 + 1):
+        syllable = chr(rng.randrange(0x1100, 0x1113)) + chr(rng.randrange(0x1161, 0x1176))
+        if rng.random() < 0.5:
+            syllable += chr(rng.randrange(0x11A8, 0x11C3))
+        pieces.append(syllable)
+        if rng.random() < 0.2:
+            pieces.append(" ")
+    return "".join(pieces)
+
+
+def _combining_text(rng: random.Random, size: int) -> str:
+    # Base letters with 1-3 marks in random order, so NFC both composes and reorders.
+    pieces = []
+    for _ in range(size // 5 + 1):
+        pieces.append(rng.choice("aeiouncAEIOUNC"))
+        for _ in range(rng.randint(1, 3)):
+            pieces.append(chr(rng.randrange(0x0300, 0x0370)))
+    return "".join(pieces)
+
+
+def _clean(text_builder: Callable[[random.Random, int], str]) -> Callable[[random.Random, int], bytes]:
+    def build(rng: random.Random, size: int) -> bytes:
+        data = text_builder(rng, size).encode("utf-8")[:size]
+        # Drop a sequence cut by the size limit so clean corpora stay valid.
+        return data.decode("utf-8", "ignore").encode("utf-8")
+
+    return build
+
+
+def _corrupted(rate: float) -> Callable[[random.Random, int], bytes]:
+    def build(rng: random.Random, size: int) -> bytes:
+        data = bytearray(_clean(_latin1_text)(rng, size))
+        for _ in range(int(len(data) * rate)):
+            data[rng.randrange(len(data))] = rng.randrange(256)
+        return bytes(data)
+
+    return build
+
+
+CORPORA: Dict[str, Callable[[random.Random, int], bytes]] = {
+    "ascii": _clean(_ascii_text),
+    "latin1": _clean(_latin1_text),
+    "cjk": _clean(_cjk_text),
+    "emoji": _clean(_emoji_text),
+    "jamo": _clean(_jamo_text),
+    "combining": _clean(_combining_text),
+    "corrupt-0.1": _corrupted(0.001),
+    "corrupt-1": _corrupted(0.01),
+    "corrupt-10": _corrupted(0.1),
+}
+
+
+def build_corpus(name: str, size: int = DEFAULT_CORPUS_SIZE, seed: int = 0) -> bytes:
+    """Return ``size`` bytes (or slightly fewer) of the named corpus, deterministic per seed."""
+    try:
+        builder = CORPORA[name]
+    except KeyError:
+        raise ValueError(f"unknown corpus {name!r}; choose from {', '.join(CORPORA)}") from None
+    return builder(random.Random(f"{name}:{seed}"), size)
+
+
+@dataclass
+class BenchmarkResult:
+    """One (solution, corpus, chunk size) measurement.
+
+    ``net_blocks_per_push`` is the growth of ``sys.getallocatedblocks()`` over
+    one pass divided by the number of pushes: memory blocks the normalizer
+    retains per push, not the number of allocations it makes.
+    """
+
+    solution: str
+    corpus: str
+    chunk_size: int
+    bytes: int = 0
+    pushes: int = 0
+    seconds: float = 0.0
+    mb_per_s: float = 0.0
+    ns_per_byte: float = 0.0
+    push_p50_ns: int = 0
+    push_p99_ns: int = 0
+    peak_bytes: int = 0
+    net_blocks_per_push: float = 0.0
+    error: str = ""
+
+
+def _percentile(sorted_values: Sequence[int], fraction: float) -> int:
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def _timed_pass(factory: NormalizerFactory, chunks: Sequence[bytes]) -> tuple:
+    normalizer = factory()
+    push = normalizer.push
+    clock = time.perf_counter_ns
+    latencies = []
+    started = clock()
+    for chunk in chunks:
+        before = clock()
+        push(chunk)
+        latencies.append(clock() - before)
+    normalizer.finish()
+    return clock() - started, latencies
+
+
+def _memory_pass(factory: NormalizerFactory, chunks: Sequence[bytes]) -> tuple:
+    tracemalloc.start()
+    try:
+        normalizer = factory()
+        blocks = sys.getallocatedblocks()
+        for chunk in chunks:
+            normalizer.push(chunk)
+        retained = sys.getallocatedblocks() - blocks
+        normalizer.finish()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak, retained
+
+
+def benchmark_normalizer(
+    factory: NormalizerFactory,
+    data: bytes,
+    chunk_size: int,
+    repeat: int = DEFAULT_REPEAT,
+    result: Optional[BenchmarkResult] = None,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+) -> BenchmarkResult:
+    """Measure one normalizer on ``data`` pushed in ``chunk_size`` pieces.
+
+    Throughput is the best of up to ``repeat`` timed passes (fewer once
+    ``time_budget`` seconds are spent, so slow candidates stay affordable),
+    latency percentiles come from that pass, and memory is measured in a
+    separate traced pass so tracemalloc overhead does not skew the timings.
+    """
+    result = result or BenchmarkResult(solution="", corpus="", chunk_size=chunk_size)
+    data = data[:chunk_size * MAX_PUSHES]
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    # Warm-up: lazy tables, caches, imports.
+    _timed_pass(factory, chunks[:max(1, WARMUP_BYTES // chunk_size)])
+
+    best_ns, best_latencies = None, []
+    spent_ns = 0
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, repeat)):
+            elapsed, latencies = _timed_pass(factory, chunks)
+            if best_ns is None or elapsed < best_ns:
+                best_ns, best_latencies = elapsed, latencies
+            spent_ns += elapsed
+            if spent_ns >= time_budget * 1e9:
+                break
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    peak, retained = _memory_pass(factory, chunks)
+    best_latencies.sort()
+    best_ns = max(best_ns, 1)
+    result.bytes = len(data)
+    result.pushes = len(chunks)
+    result.seconds = best_ns / 1e9
+    result.mb_per_s = len(data) / result.seconds / 1e6
+    result.ns_per_byte = best_ns / max(len(data), 1)
+    result.push_p50_ns = _percentile(best_latencies, 0.50)
+    result.push_p99_ns = _percentile(best_latencies, 0.99)
+    result.peak_bytes = peak
+    result.net_blocks_per_push = retained / max(len(chunks), 1)
+    return result
+
+
+def run_benchmarks(
+    solutions: Sequence[Path],
+    corpora: Optional[Sequence[str]] = None,
+    chunk_sizes: Optional[Sequence[int]] = None,
+    size: int = DEFAULT_CORPUS_SIZE,
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+) -> Dict[str, Any]:
+    """Benchmark every solution over the corpus x chunk size matrix.
+
+    A solution that fails to load or raises on a corpus gets its ``error``
+    field set instead of aborting the whole run.
+    """
+    corpora = list(corpora or CORPORA)
+    chunk_sizes = list(chunk_sizes or DEFAULT_CHUNK_SIZES)
+    corpus_data = {name: build_corpus(name, size, seed) for name in corpora}
+    results: List[BenchmarkResult] = []
+
+    for solution in solutions:
+        factory, load_error = None, ""
+        try:
+            factory = load_normalizer(Path(solution))
+        except Exception as exc:  # candidate code may fail to import
+            load_error = f"{type(exc).__name__}: {exc}"
+        for corpus in corpora:
+            for chunk_size in chunk_sizes:
+                result = BenchmarkResult(solution=str(solution), corpus=corpus, chunk_size=chunk_size)
+                if factory is None:
+                    result.error = load_error
+                else:
+                    try:
+                        benchmark_normalizer(
+                            factory, corpus_data[corpus], chunk_size, repeat, result, time_budget
+                        )
+                    except Exception as exc:  # candidate code may raise
+                        result.error = f"{type(exc).__name__}: {exc}"
+                results.append(result)
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "unidata_version": unicodedata.unidata_version,
+        "corpus_size": size,
+        "repeat": repeat,
+        "seed": seed,
+        "max_pushes": MAX_PUSHES,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def _peak_rss_bytes() -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def summarize_benchmark(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Collapse a ``run_benchmarks`` report into headline numbers.
+
+    Throughput is total bytes over total seconds across all successful
+    measurements, p50 is the median of their push p50s and p99 the worst
+    push p99. ``error`` carries the first failure, if any.
+    """
+    measured = [result for result in report.get("results", []) if not result.get("error")]
+    failures = [result["error"] for result in report.get("results", []) if result.get("error")]
+    seconds = sum(result["seconds"] for result in measured)
+    return {
+        "mb_per_s": sum(result["bytes"] for result in measured) / seconds / 1e6 if seconds else 0.0,
+        "push_p50_ns": int(statistics.median(result["push_p50_ns"] for result in measured)) if measured else 0,
+        "push_p99_ns": max((result["push_p99_ns"] for result in measured), default=0),
+        "peak_rss_bytes": report.get("peak_rss_bytes", 0),
+        "error": failures[0] if failures else "",
+    }
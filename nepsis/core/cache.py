@@ -0,0 +1,107 @@
+"""Content-addressed cache of experiment run payloads."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+DEFAULT_CACHE_ENTRIES = 4096
+DEFAULT_CACHE_BYTES = 256 << 20
+
+
+def _hash_path(digest, path: Path) -> None:
+    if path.is_dir():
+        files = sorted(p for p in path.rglob("*") if p.is_file() and "__pycache__" not in p.parts)
+        names = [str(file.relative_to(path)) for file in files]
+    else:
+        files, names = [path], [path.name]
+    for name, file in zip(names, files):
+        digest.update(name.encode("utf-8") + b"\0")
+        digest.update(file.read_bytes() if file.exists() else b"")
+        digest.update(b"\0")
+
+
+def cache_key(solution: Path, tests: Iterable[Path], trial: int = 0, **settings: object) -> str:
+    """SHA-256 over the solution, the tests, the interpreter and Unicode versions.
+
+    ``tests`` may hold directories (hashed file by file) and paths that do not
+    exist (hashed as empty, e.g. an absent conftest). ``settings`` are the
+    runner options that change the payload, such as ``in_process``.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{sys.version}\0{unicodedata.unidata_version}\0{trial}\0".encode("utf-8"))
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8") + b"\0")
+    digest.update(Path(solution).read_bytes() + b"\0")  # content only: renamed copies still hit
+    for path in tests:
+        _hash_path(digest, Path(path))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """One JSON payload per key under ``directory``, evicted least recently used.
+
+    A hit refreshes the entry's mtime, so ``prune`` drops the entries that
+    have gone unused longest until at most ``max_entries`` files and
+    ``max_bytes`` bytes remain. Writes go through a temporary file and
+    ``os.replace``, so concurrent runs never read a partial entry.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, object]]:
+        path = self._path(key)
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    def put(self, key: str, payload: Dict[str, object]) -> None:
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, separators=(",", ":"))
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+
+    def prune(self) -> int:
+        """Evict least recently used entries past the limits; return how many went."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(reverse=True)
+
+        kept_bytes = 0
+        removed = 0
+        for index, (_, size, path) in enumerate(entries):
+            kept_bytes += size
+            if index >= self.max_entries or kept_bytes > self.max_bytes:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
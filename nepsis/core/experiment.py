@@ -2,19 +2,43 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import shutil
 import subprocess
 import sys
-from dataclasses import dataclass
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from subprocess import CompletedProcess
 from typing import Callable, Dict, Iterable, List, Optional
+from xml.etree import ElementTree
+
+from .benchmark import STANDARD_CHUNK_SIZE, STANDARD_CORPORA, STANDARD_CORPUS_SIZE, summarize_benchmark
+from .cache import ResultCache, cache_key
+from .inprocess import DEFAULT_TEST_TIMEOUT, run_tests_in_process
+from .results import RESULTS_LOG_FILENAME, ResultsLog
+from .stats import summarize_trials
+from .store import RESULTS_STORE_FILENAME, ResultsStore
 
 
 Runner = Callable[[List[str], Path], CompletedProcess]
 
+SCORECARD_HEADER = (
+    "trial_id,condition,model_name_version,prompt_file,"
+    "tests_passed,tests_failed,tests_errored,"
+    "mb_per_s,push_p50_ns,push_p99_ns,peak_rss_bytes,notes\n"
+)
+# JUnit child element → case outcome; a testcase without one passed.
+_JUNIT_OUTCOMES = {"failure": "failed", "error": "error", "skipped": "skipped"}
+# case outcome → counter in the condition's "tests" metrics
+_CASE_METRICS = {"passed": "passed", "failed": "failed", "error": "errors"}
+
 
 @dataclass
 class ConditionSpec:
@@ -25,8 +49,90 @@ class ConditionSpec:
     prompt_path: Optional[Path] = None
 
 
+class _ExclusiveGate:
+    """Any number of shared holders, or one exclusive holder alone.
+
+    A waiting exclusive holder keeps new shared holders out, so benchmarks
+    are not starved by a queue of test runs.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._waiting = 0
+
+    @contextmanager
+    def shared(self):
+        with self._condition:
+            self._condition.wait_for(lambda: not self._exclusive and not self._waiting)
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            self._waiting += 1
+            self._condition.wait_for(lambda: not self._exclusive and not self._shared)
+            self._waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+
+def discover_candidates(directory: Path, prompts_dir: Optional[Path] = None) -> List[ConditionSpec]:
+    """One condition per ``*.py`` file under ``directory``.
+
+    Files in a subdirectory take its name as their condition (``naked/gen_017.py``
+    → ``naked``), so many generations of one condition pool into a single
+    distribution; files directly in ``directory`` are conditions of their own.
+    The prompt is ``prompts_dir/<condition>.txt`` when that file exists.
+    """
+    conditions = []
+    for path in sorted(directory.rglob("*.py")):
+        name = path.stem if path.parent == directory else path.parent.name
+        prompt = prompts_dir / f"{name}.txt" if prompts_dir else None
+        conditions.append(ConditionSpec(name, path, prompt if prompt and prompt.exists() else None))
+    return conditions
+
+
 class ExperimentRunner:
-    """Coordinate solution swapping, pytest execution, and artifact capture."""
+    """Coordinate isolated pytest execution per condition and artifact capture.
+
+    Every (condition, trial) runs in its own temporary directory holding a
+    copy of the tests and the condition's solution as ``solution_filename``,
+    so the workspace is never modified and runs can overlap. Up to
+    ``max_workers`` of them run at once; each one waits on its own pytest
+    subprocess, so a thread pool is enough to keep that many processes busy.
+
+    With ``in_process`` the tests run through ``run_tests_in_process``
+    instead: no pytest subprocess or scratch directory, one forked worker per
+    run with a ``test_timeout`` per test.
+
+    With ``benchmark`` enabled each condition is also run through the
+    standard throughput/memory benchmark (``nepsis benchmark``, via the same
+    runner) and scored on MB/s, p50/p99 push latency and peak RSS. Tests of
+    different runs overlap, but a benchmark waits for running tests to finish
+    and runs alone, so its timings are not skewed by the rest of the pool.
+
+    With ``cache`` each run's payload is stored under ``artifacts/cache``,
+    keyed on the content of the solution and tests, the Python and Unicode
+    versions, the trial index and the options above; a later run with the
+    same key reuses it (marked ``"cached": true``) instead of running again.
+
+    With ``results_store`` every run is also inserted into the SQLite
+    ``ResultsStore`` at ``artifacts/results.sqlite``, which accumulates
+    across invocations for ``nepsis results`` queries.
+    """
 
     def __init__(
         self,
@@ -35,13 +141,26 @@ class ExperimentRunner:
         artifacts_path: Path,
         solution_filename: str = "solution.py",
         runner: Optional[Runner] = None,
+        benchmark: bool = True,
+        max_workers: int = 1,
+        in_process: bool = False,
+        test_timeout: float = DEFAULT_TEST_TIMEOUT,
+        cache: bool = True,
+        results_store: bool = True,
     ) -> None:
         self.workspace = workspace
         self.tests_path = tests_path
         self.artifacts_path = artifacts_path
-        self.solution_path = workspace / solution_filename
+        self.solution_filename = solution_filename
         self.runner = runner or self._default_runner
+        self.benchmark = benchmark
+        self.max_workers = max(1, max_workers)
+        self.in_process = in_process
+        self.test_timeout = test_timeout
         self.artifacts_path.mkdir(parents=True, exist_ok=True)
+        self.cache = ResultCache(self.artifacts_path / "cache") if cache else None
+        self.results_store = results_store
+        self._gate = _ExclusiveGate()
 
     @staticmethod
     def _default_runner(cmd: List[str], cwd: Path) -> CompletedProcess:
@@ -52,83 +171,228 @@ class ExperimentRunner:
         conditions: Iterable[ConditionSpec],
         model_name: str = "",
         notes: Optional[str] = None,
+        trials: int = 1,
     ) -> Dict[str, object]:
-        """Run pytest for each condition and write artifacts.
-
-        Returns the aggregated result payload.
+        """Run pytest for each condition ``trials`` times and write artifacts.
+
+        Every run gets a trial ID ``<condition>-<NNNN>`` numbered across all
+        solutions sharing that condition name. Scorecard rows and
+        ``automated_results.jsonl`` lines are appended as runs complete, so
+        memory does not grow with full payloads; ``conditions`` in the
+        returned payload is a ``ResultsLog`` over that file, in condition,
+        then trial order. ``statistics`` holds per-condition pass-rate and
+        runtime distributions (see ``summarize_trials``).
         """
-        original_content: Optional[str]
-        if self.solution_path.exists():
-            original_content = self.solution_path.read_text(encoding="utf-8")
-        else:
-            original_content = None
+        conditions = list(conditions)
+        for condition in conditions:
+            source = self._resolve(condition.solution_path)
+            if not source.exists():
+                raise FileNotFoundError(f"Solution file not found: {source}")
 
         aggregated: Dict[str, object] = {
             "generated_at": datetime.now(timezone.utc).isoformat(),
             "model_name": model_name,
             "notes": notes or "",
-            "conditions": [],
         }
 
-        scorecard_rows: List[str] = []
-
-        try:
-            for condition in conditions:
-                stdout_text: str
-                stderr_text: str
-                return_code: int
-
-                self._install_solution(condition.solution_path)
-                result = self.runner(
-                    [sys.executable, "-m", "pytest", str(self.tests_path), "-q"],
-                    cwd=self.workspace,
-                )
-                stdout_text = result.stdout or ""
-                stderr_text = result.stderr or ""
-                return_code = result.returncode
-
-                summary_line = self._extract_summary(stdout_text, stderr_text)
-                tests_summary = self._parse_summary(summary_line)
-
-                condition_payload = {
-                    "condition": condition.name,
-                    "solution": str(condition.solution_path),
-                    "prompt": str(condition.prompt_path) if condition.prompt_path else "",
-                    "returncode": return_code,
-                    "summary": summary_line,
-                    "stdout": stdout_text.strip(),
-                    "stderr": stderr_text.strip(),
-                    "tests": tests_summary,
-                }
-                aggregated["conditions"].append(condition_payload)
-
-                self._write_condition_artifacts(condition.name, condition_payload)
-
-                scorecard_rows.append(
+        jobs = []
+        runs_per_condition: Dict[str, int] = {}
+        for condition in conditions:
+            for trial in range(trials):
+                index = runs_per_condition.get(condition.name, 0)
+                runs_per_condition[condition.name] = index + 1
+                jobs.append((condition, trial, f"{condition.name}-{index:04d}"))
+
+        log = ResultsLog(self.artifacts_path / RESULTS_LOG_FILENAME, aggregated, slots=len(jobs))
+        store = ResultsStore(self.artifacts_path / RESULTS_STORE_FILENAME) if self.results_store else None
+        scorecard = (self.artifacts_path / "automated_scorecard.csv").open("w", encoding="utf-8")
+        with log, store or nullcontext(), scorecard, ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            scorecard.write(SCORECARD_HEADER)
+            scorecard.flush()
+            futures = {pool.submit(self._run_condition, *job): position for position, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                position = futures.pop(future)
+                condition, _, trial_id = jobs[position]
+                condition_payload = future.result()
+                log.append(position, condition_payload)
+                if store is not None:
+                    store.record(aggregated, condition_payload)
+
+                single_run = runs_per_condition[condition.name] == 1
+                self._write_condition_artifacts(condition.name if single_run else trial_id, condition_payload)
+
+                scorecard.write(
                     self._format_scorecard_row(
                         condition=condition_payload,
                         model_name=model_name,
                         notes=notes,
                     )
                 )
-        finally:
-            self._restore_original(original_content)
+                scorecard.flush()
+
+        if self.cache is not None:
+            self.cache.prune()
+        aggregated["conditions"] = log
+        aggregated["statistics"] = summarize_trials(log)
+        return write_reports(self.artifacts_path, aggregated)
+
+    def _run_condition(self, condition: ConditionSpec, trial: int, trial_id: str) -> Dict[str, object]:
+        identity = {
+            "condition": condition.name,
+            "trial": trial,
+            "trial_id": trial_id,
+            "solution": str(condition.solution_path),
+            "solution_sha256": hashlib.sha256(self._resolve(condition.solution_path).read_bytes()).hexdigest(),
+            "prompt": str(condition.prompt_path) if condition.prompt_path else "",
+        }
+        key = self._cache_key(condition, trial) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                cached.update(identity, cached=True)
+                return cached
+
+        payload = self._execute_condition(condition)
+        payload = {**identity, **payload, "cached": False}
+        if key is not None:
+            self.cache.put(key, payload)
+        return payload
+
+    def _cache_key(self, condition: ConditionSpec, trial: int) -> str:
+        tests = [self.tests_path]
+        if not self.tests_path.is_dir():
+            tests.append(self.tests_path.parent / "conftest.py")
+        return cache_key(
+            self._resolve(condition.solution_path),
+            tests,
+            trial,
+            solution_filename=self.solution_filename,
+            in_process=self.in_process,
+            test_timeout=self.test_timeout if self.in_process else None,
+            benchmark=self.benchmark,
+        )
 
-        self._write_aggregated_artifacts(aggregated, scorecard_rows)
-        return aggregated
+    def _execute_condition(self, condition: ConditionSpec) -> Dict[str, object]:
+        with self._gate.shared():
+            payload = self._execute_tests(condition)
+        if self.benchmark:
+            with self._gate.exclusive():
+                payload["performance"] = self._run_benchmark(condition.solution_path)
+        return payload
+
+    def _execute_tests(self, condition: ConditionSpec) -> Dict[str, object]:
+        started = time.perf_counter()
+        if self.in_process:
+            result = run_tests_in_process(
+                self._resolve(condition.solution_path),
+                self.tests_path,
+                timeout=self.test_timeout,
+                solution_module=Path(self.solution_filename).stem,
+            )
+            stdout_text, stderr_text = result.stdout, result.stderr
+            summary_line = result.summary
+            cases: Optional[List[Dict[str, object]]] = [asdict(case) for case in result.cases]
+        else:
+            with tempfile.TemporaryDirectory(prefix=f"nepsis-{condition.name}-") as scratch:
+                scratch_path = Path(scratch)
+                tests_copy = self._prepare_workspace(scratch_path, condition.solution_path)
+                junit_path = scratch_path / "junit.xml"
+                result = self.runner(
+                    [sys.executable, "-m", "pytest", str(tests_copy), "-q", f"--junitxml={junit_path}"],
+                    cwd=scratch_path,
+                )
+                cases = self._parse_junit(junit_path)
+            stdout_text = result.stdout or ""
+            stderr_text = result.stderr or ""
+            summary_line = self._extract_summary(stdout_text, stderr_text)
+
+        # Counts come from per-test cases; the summary line is only a fallback
+        # for runners that produced no JUnit report.
+        tests_summary = self._count_cases(cases) if cases is not None else self._parse_summary(summary_line)
+        seconds = time.perf_counter() - started
+
+        return {
+            "seconds": seconds,
+            "returncode": result.returncode,
+            "summary": summary_line,
+            "stdout": stdout_text.strip(),
+            "stderr": stderr_text.strip(),
+            "tests": tests_summary,
+            "cases": cases or [],
+            "performance": {},
+        }
 
-    def _install_solution(self, source: Path) -> None:
-        absolute_source = source if source.is_absolute() else self.workspace / source
-        if not absolute_source.exists():
-            raise FileNotFoundError(f"Solution file not found: {absolute_source}")
-        shutil.copyfile(absolute_source, self.solution_path)
+    def _prepare_workspace(self, scratch: Path, solution: Path) -> Path:
+        """Copy the solution and tests into ``scratch``; return the copied pytest target."""
+        shutil.copyfile(self._resolve(solution), scratch / self.solution_filename)
+        tests_dir = scratch / "tests"
+        if self.tests_path.is_dir():
+            shutil.copytree(self.tests_path, tests_dir)
+            return tests_dir
+        tests_dir.mkdir()
+        shutil.copyfile(self.tests_path, tests_dir / self.tests_path.name)
+        conftest = self.tests_path.parent / "conftest.py"
+        if conftest.exists():
+            shutil.copyfile(conftest, tests_dir / conftest.name)
+        return tests_dir / self.tests_path.name
+
+    def _resolve(self, path: Path) -> Path:
+        return path if path.is_absolute() else self.workspace / path
+
+    def _run_benchmark(self, source: Path) -> Dict[str, object]:
+        cmd = [
+            sys.executable, "-m", "nepsis.cli.nepsis", "benchmark", str(self._resolve(source)),
+            "--size", str(STANDARD_CORPUS_SIZE), "--chunk-size", str(STANDARD_CHUNK_SIZE),
+        ]
+        for corpus in STANDARD_CORPORA:
+            cmd.extend(["--corpus", corpus])
+        result = self.runner(cmd, cwd=self.workspace)
+        return self._parse_benchmark(result.stdout or "", result.stderr or "")
+
+    @staticmethod
+    def _parse_benchmark(stdout_text: str, stderr_text: str) -> Dict[str, object]:
+        try:
+            report = json.loads(stdout_text)
+        except ValueError:
+            report = None
+        if not isinstance(report, dict):
+            lines = stderr_text.strip().splitlines()
+            return {"error": lines[-1] if lines else "benchmark produced no JSON report"}
+        return summarize_benchmark(report)
 
-    def _restore_original(self, original_content: Optional[str]) -> None:
-        if original_content is None:
-            if self.solution_path.exists():
-                self.solution_path.unlink()
-            return
-        self.solution_path.write_text(original_content, encoding="utf-8")
+    @staticmethod
+    def _parse_junit(path: Path) -> Optional[List[Dict[str, object]]]:
+        """Per-test cases from a pytest ``--junitxml`` report, or None if unusable."""
+        try:
+            root = ElementTree.parse(path).getroot()
+        except (OSError, ElementTree.ParseError):
+            return None
+        cases = []
+        for testcase in root.iter("testcase"):
+            outcome, message = "passed", ""
+            for child in testcase:
+                if child.tag in _JUNIT_OUTCOMES:
+                    outcome = _JUNIT_OUTCOMES[child.tag]
+                    message = child.get("message") or (child.text or "").strip()
+                    break
+            cases.append(
+                {
+                    "name": testcase.get("name", ""),
+                    "outcome": outcome,
+                    "duration": float(testcase.get("time") or 0.0),
+                    "message": message,
+                }
+            )
+        return cases
+
+    @staticmethod
+    def _count_cases(cases: List[Dict[str, object]]) -> Dict[str, int]:
+        metrics = {"passed": 0, "failed": 0, "errors": 0}
+        for case in cases:
+            key = _CASE_METRICS.get(str(case["outcome"]))
+            if key:
+                metrics[key] += 1
+        return metrics
 
     @staticmethod
     def _extract_summary(stdout_text: str, stderr_text: str) -> str:
@@ -155,7 +419,7 @@ class ExperimentRunner:
         base = self.artifacts_path / f"automated_{condition_name}"
         (base.parent).mkdir(parents=True, exist_ok=True)
         with (base.with_suffix(".json")).open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, indent=2)
+            json.dump(payload, handle)
         with (base.with_suffix(".txt")).open("w", encoding="utf-8") as handle:
             handle.write(payload.get("stdout", ""))
             stderr = payload.get("stderr")
@@ -163,35 +427,6 @@ class ExperimentRunner:
                 handle.write("\n\n[stderr]\n")
                 handle.write(str(stderr))
 
-    def _write_aggregated_artifacts(
-        self,
-        aggregated: Dict[str, object],
-        scorecard_rows: List[str],
-    ) -> None:
-        summary_path = self.artifacts_path / "automated_results.json"
-        with summary_path.open("w", encoding="utf-8") as handle:
-            json.dump(aggregated, handle, indent=2)
-
-        markdown_path = self.artifacts_path / "automated_results.md"
-        with markdown_path.open("w", encoding="utf-8") as handle:
-            handle.write("# Automated Experiment Results\n\n")
-            handle.write(f"Generated: {aggregated['generated_at']}\n\n")
-            for condition in aggregated.get("conditions", []):
-                handle.write(f"## {condition['condition']}\n\n")
-                handle.write(f"Summary: {condition.get('summary', '')}\n\n")
-                handle.write("Tests:\n\n")
-                for metric, value in condition.get("tests", {}).items():
-                    handle.write(f"- {metric}: {value}\n")
-                handle.write("\n")
-
-        scorecard_path = self.artifacts_path / "automated_scorecard.csv"
-        header = (
-            "trial_id,condition,model_name_version,prompt_file,"
-            "tests_passed,tests_failed,tests_errored,notes\n"
-        )
-        content = header + "".join(scorecard_rows)
-        scorecard_path.write_text(content, encoding="utf-8")
-
     @staticmethod
     def _format_scorecard_row(
         condition: Dict[str, object],
@@ -202,15 +437,97 @@ class ExperimentRunner:
         passed = tests.get("passed", 0)
         failed = tests.get("failed", 0)
         errors = tests.get("errors", 0)
+        performance = condition.get("performance", {})
+        mb_per_s = performance.get("mb_per_s")
         prompt = condition.get("prompt", "")
         fields = [
-            "",
+            condition.get("trial_id", ""),
             condition.get("condition", ""),
             model_name,
             prompt,
             str(passed),
             str(failed),
             str(errors),
+            f"{mb_per_s:.2f}" if mb_per_s is not None else "",
+            str(performance.get("push_p50_ns", "")),
+            str(performance.get("push_p99_ns", "")),
+            str(performance.get("peak_rss_bytes", "")),
             notes or "",
         ]
         return ",".join(fields) + "\n"
+
+
+def write_reports(artifacts_path: Path, aggregated: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    """Write ``automated_results.json`` and ``.md`` by streaming over the trials.
+
+    Without ``aggregated`` the run is read back from the JSONL results log in
+    ``artifacts_path``, so reports can be rebuilt on demand, including for a
+    sweep that was interrupted. Trial payloads are read one at a time.
+    """
+    if aggregated is None:
+        log = ResultsLog.read(artifacts_path / RESULTS_LOG_FILENAME)
+        aggregated = {**log.metadata, "conditions": log, "statistics": summarize_trials(log)}
+
+    summary_path = artifacts_path / "automated_results.json"
+    with summary_path.open("w", encoding="utf-8") as handle:
+        header = {key: value for key, value in aggregated.items() if key != "conditions"}
+        handle.write(json.dumps(header)[:-1] + ', "conditions": [')
+        for index, condition in enumerate(aggregated.get("conditions", [])):
+            handle.write((", " if index else "") + json.dumps(condition))
+        handle.write("]}\n")
+
+    markdown_path = artifacts_path / "automated_results.md"
+    with markdown_path.open("w", encoding="utf-8") as handle:
+        handle.write("# Automated Experiment Results\n\n")
+        handle.write(f"Generated: {aggregated['generated_at']}\n\n")
+        statistics = aggregated.get("statistics", {})
+        if any(entry["trials"] > 1 for entry in statistics.values()):
+            handle.write("## Statistics\n\n")
+            handle.write("| condition | trials | all passed | pass rate mean [95% CI] | pass rate p50 / p95 "
+                         "| runtime mean [95% CI] | runtime p50 / p95 |\n")
+            handle.write("|---|---|---|---|---|---|---|\n")
+            for name, entry in statistics.items():
+                rate, runtime = entry["pass_rate"], entry["runtime_seconds"]
+                handle.write(
+                    f"| {name} | {entry['trials']} | {entry['all_passed']:.1%} "
+                    f"| {rate['mean']:.3f} [{rate['ci_low']:.3f}, {rate['ci_high']:.3f}] "
+                    f"| {rate['p50']:.3f} / {rate['p95']:.3f} "
+                    f"| {runtime['mean']:.2f}s [{runtime['ci_low']:.2f}, {runtime['ci_high']:.2f}] "
+                    f"| {runtime['p50']:.2f}s / {runtime['p95']:.2f}s |\n"
+                )
+            handle.write("\n")
+        for condition in aggregated.get("conditions", []):
+            heading = condition["condition"]
+            if statistics.get(heading, {}).get("trials", 1) > 1:
+                heading = f"{heading} ({condition['trial_id']})"
+            handle.write(f"## {heading}\n\n")
+            handle.write(f"Summary: {condition.get('summary', '')}\n\n")
+            handle.write("Tests:\n\n")
+            for metric, value in condition.get("tests", {}).items():
+                handle.write(f"- {metric}: {value}\n")
+            handle.write("\n")
+            cases = condition.get("cases", [])
+            failures = [case for case in cases if case["outcome"] in ("failed", "error")]
+            if failures:
+                handle.write("Failures:\n\n")
+                for case in failures:
+                    message = str(case["message"]).strip().splitlines()
+                    handle.write(f"- {case['name']}: {message[0] if message else case['outcome']}\n")
+                handle.write("\n")
+            if cases:
+                handle.write("Slowest tests:\n\n")
+                for case in sorted(cases, key=lambda case: case["duration"], reverse=True)[:3]:
+                    handle.write(f"- {case['name']}: {case['duration'] * 1000:.1f} ms\n")
+                handle.write("\n")
+            performance = condition.get("performance", {})
+            if performance:
+                handle.write("Performance:\n\n")
+                if performance.get("error"):
+                    handle.write(f"- error: {performance['error']}\n")
+                if "mb_per_s" in performance:
+                    handle.write(f"- throughput: {performance['mb_per_s']:.2f} MB/s\n")
+                    handle.write(f"- push latency p50: {performance['push_p50_ns'] / 1000:.1f} us\n")
+                    handle.write(f"- push latency p99: {performance['push_p99_ns'] / 1000:.1f} us\n")
+                    handle.write(f"- peak RSS: {performance['peak_rss_bytes'] / (1 << 20):.1f} MiB\n")
+                handle.write("\n")
+    return aggregated
@@ -0,0 +1,222 @@
+"""Run a candidate's acceptance tests without a pytest subprocess per condition."""
+
+from __future__ import annotations
+
+import inspect
+import io
+import multiprocessing
+import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .normalize import load_solution_module
+
+DEFAULT_TEST_TIMEOUT = 10.0
+# pytest exit codes mirrored by InProcessResult.returncode
+EXIT_OK = 0
+EXIT_TESTS_FAILED = 1
+EXIT_COLLECTION_ERROR = 2
+EXIT_NO_TESTS = 5
+
+
+@dataclass
+class CaseResult:
+    """Outcome of one test function."""
+
+    name: str
+    outcome: str  # "passed", "failed" or "error"
+    duration: float = 0.0
+    message: str = ""  # one line, e.g. "AssertionError: assert out == 'x'"
+
+
+@dataclass
+class InProcessResult:
+    """Same fields ExperimentRunner records for a pytest subprocess run."""
+
+    returncode: int
+    summary: str
+    stdout: str
+    stderr: str = ""
+    tests: Dict[str, int] = field(default_factory=dict)
+    cases: List[CaseResult] = field(default_factory=list)
+
+
+def _worker(conn, solution_path: str, tests_path: str, solution_module: str, start: int) -> None:
+    """Child process: import the candidate, then run test functions from ``start`` on.
+
+    Messages: ("tests", names) once, then ("start", name) and
+    ("result", name, outcome, duration, message) per test, then ("done",).
+    A collection failure sends ("collect-error", message) instead.
+    """
+    try:
+        try:
+            candidate = load_solution_module(Path(solution_path))
+        except BaseException:  # tests then fail on import, like pytest would
+            candidate = None
+            import_error = traceback.format_exc()
+        else:
+            sys.modules[solution_module] = candidate
+        tests = load_solution_module(Path(tests_path))
+        names = [
+            name
+            for name, value in vars(tests).items()
+            if name.startswith("test") and inspect.isfunction(value) and value.__module__ == tests.__name__
+        ]
+    except BaseException:
+        conn.send(("collect-error", traceback.format_exc()))
+        return
+
+    conn.send(("tests", names))
+    for name in names[start:]:
+        conn.send(("start", name))
+        function = getattr(tests, name)
+        began = time.perf_counter()
+        if inspect.signature(function).parameters:
+            outcome, message = "error", "fixtures are not supported by the in-process runner"
+        elif candidate is None:
+            outcome, message = "failed", import_error
+        else:
+            try:
+                with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                    function()
+                outcome, message = "passed", ""
+            except BaseException:
+                outcome, message = "failed", traceback.format_exc()
+        conn.send(("result", name, outcome, time.perf_counter() - began, message))
+    conn.send(("done",))
+
+
+def _context():
+    # forkserver forks workers from a clean single-threaded server, which is
+    # safe even when ExperimentRunner calls this from several threads.
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload([__name__])  # import nepsis once in the server, not per worker
+    return ctx
+
+
+def run_tests_in_process(
+    solution_path: Path,
+    tests_path: Path,
+    timeout: float = DEFAULT_TEST_TIMEOUT,
+    solution_module: str = "solution",
+) -> InProcessResult:
+    """Run the ``test*`` functions of ``tests_path`` against ``solution_path``.
+
+    The candidate is imported under a unique module name and aliased as
+    ``sys.modules[solution_module]`` inside a forked worker, so the tests'
+    ``import solution`` resolves to it and nothing leaks into this process.
+    A test that runs past ``timeout`` seconds or kills the worker is
+    recorded as failed and a fresh worker resumes with the next test.
+    """
+    ctx = _context()
+    solution_file = str(Path(solution_path).resolve())
+    tests_file = str(Path(tests_path).resolve())
+    began = time.perf_counter()
+    cases: List[CaseResult] = []
+    collect_error: Optional[str] = None
+
+    finished = False
+    while not finished:
+        receiver, sender = ctx.Pipe(duplex=False)
+        worker = ctx.Process(
+            target=_worker,
+            args=(sender, solution_file, tests_file, solution_module, len(cases)),
+            daemon=True,
+        )
+        worker.start()
+        sender.close()
+        current: Optional[str] = None
+        while True:
+            # Collection (imports) gets the same allowance as a single test.
+            if not receiver.poll(timeout):
+                worker.kill()
+                reason = f"timed out after {timeout:g}s"
+                if current is None:
+                    collect_error = f"collection {reason}"
+                    finished = True
+                else:
+                    cases.append(CaseResult(current, "failed", timeout, reason))
+                break
+            try:
+                message = receiver.recv()
+            except EOFError:
+                worker.join()
+                reason = f"worker crashed with exit code {worker.exitcode}"
+                if current is None:
+                    collect_error = reason
+                    finished = True
+                else:
+                    cases.append(CaseResult(current, "failed", 0.0, reason))
+                break
+            kind = message[0]
+            if kind == "start":
+                current = message[1]
+            elif kind == "result":
+                name, outcome, duration, details = message[1:]
+                cases.append(CaseResult(name, outcome, duration, _short_message(details)))
+                current = None
+            elif kind == "collect-error":
+                collect_error, finished = message[1], True
+                break
+            elif kind == "done":
+                finished = True
+                break
+        receiver.close()
+        worker.join()
+
+    return _build_result(tests_path, cases, collect_error, time.perf_counter() - began)
+
+
+def _build_result(
+    tests_path: Path, cases: List[CaseResult], collect_error: Optional[str], seconds: float
+) -> InProcessResult:
+    counts = {"passed": 0, "failed": 0, "errors": 0}
+    for case in cases:
+        counts["errors" if case.outcome == "error" else case.outcome] += 1
+    if collect_error is not None:
+        counts["errors"] += 1
+
+    parts = []
+    if counts["failed"]:
+        parts.append(f"{counts['failed']} failed")
+    if counts["passed"]:
+        parts.append(f"{counts['passed']} passed")
+    if counts["errors"]:
+        parts.append(f"{counts['errors']} error{'s' if counts['errors'] > 1 else ''}")
+    summary = f"{', '.join(parts) or 'no tests ran'} in {seconds:.2f}s"
+
+    lines = ["".join({"passed": ".", "failed": "F", "error": "E"}[case.outcome] for case in cases)]
+    for case in cases:
+        if case.outcome != "passed":
+            label = "FAILED" if case.outcome == "failed" else "ERROR"
+            lines.append(f"{label} {Path(tests_path).name}::{case.name} - {case.message}")
+    if collect_error is not None:
+        lines.append(f"ERROR {Path(tests_path).name} - collection failed\n{collect_error.rstrip()}")
+    lines.append(summary)
+
+    if collect_error is not None:
+        returncode = EXIT_COLLECTION_ERROR
+    elif not cases:
+        returncode = EXIT_NO_TESTS
+    elif counts["failed"] or counts["errors"]:
+        returncode = EXIT_TESTS_FAILED
+    else:
+        returncode = EXIT_OK
+    return InProcessResult(returncode, summary, "\n".join(lines), tests=counts, cases=cases)
+
+
+def _short_message(message: str) -> str:
+    """Last traceback line; a bare ``AssertionError`` gets the failing source line."""
+    # Drop the ^^^/~~~ position markers newer tracebacks put under source lines.
+    lines = [line for line in message.strip().splitlines() if line.strip().strip("^~")]
+    if not lines:
+        return ""
+    if ":" not in lines[-1] and len(lines) > 1:
+        return f"{lines[-1]}: {lines[-2].strip()}"
+    return lines[-1]
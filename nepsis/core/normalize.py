@@ -0,0 +1,372 @@
+"""Stream files and pipes through a candidate Utf8StreamNormalizer."""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib.util
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import BinaryIO, Callable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+DEFAULT_BLOCK_SIZE = 1 << 16
+DEFAULT_MMAP_WINDOW = 1 << 24
+DEFAULT_SHARD_SIZE = 1 << 26
+# How far past a target cut point to look for a safe boundary before giving up.
+MAX_BOUNDARY_SCAN = 1 << 16
+# BOUNDARY bit of a solution's code_point_flags(): stable NFC boundary before the char.
+_BOUNDARY = 0x02
+
+NormalizerFactory = Callable[[], object]
+
+
+@dataclass
+class NormalizeStats:
+    """Counters collected while normalizing one input."""
+
+    bytes_in: int = 0
+    bytes_out: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        if self.seconds <= 0:
+            return 0.0
+        return self.bytes_in / self.seconds / 1e6
+
+    def as_dict(self) -> dict:
+        return {
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 6),
+            "mb_per_s": round(self.mb_per_s, 3),
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def load_solution_module(solution_path: Path) -> ModuleType:
+    """Import a candidate solution file once per process.
+
+    Each path gets its own module name so several candidates can be loaded
+    side by side without touching ``sys.modules["solution"]``.
+    """
+    solution_path = Path(solution_path).resolve()
+    digest = hashlib.sha1(str(solution_path).encode("utf-8")).hexdigest()[:12]
+    module_name = f"nepsis_candidate_{solution_path.stem}_{digest}"
+    spec = importlib.util.spec_from_file_location(module_name, solution_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot import solution file: {solution_path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_normalizer(solution_path: Path) -> type:
+    """Return ``Utf8StreamNormalizer`` from a candidate solution file."""
+    return getattr(load_solution_module(Path(solution_path).resolve()), "Utf8StreamNormalizer")
+
+
+def drain_errors(normalizer: object, errors_sink: Optional[TextIO]) -> int:
+    """Write pending error spans as JSONL and clear them from the normalizer.
+
+    Returns the number of spans drained. Clearing keeps memory flat on long
+    inputs; it relies on the normalizer only ever appending to ``errors``.
+    """
+    errors = getattr(normalizer, "errors", None)
+    if not errors:
+        return 0
+    count = len(errors)
+    if errors_sink is not None:
+        for record in _error_records(errors):
+            errors_sink.write(json.dumps(record) + "\n")
+    del errors[:]
+    return count
+
+
+def _error_records(errors: Sequence[Tuple[int, int]], shift: int = 0) -> Iterator[dict]:
+    """Yield JSON-ready error records, with the kind code when the store has one."""
+    kinds = getattr(errors, "kinds", None)
+    for index, (start, end) in enumerate(errors):
+        record = {"start": start + shift, "end": end + shift}
+        if kinds is not None:
+            record["kind"] = kinds[index]
+        yield record
+
+
+def normalize_stream(
+    source: BinaryIO,
+    sink: BinaryIO,
+    normalizer_factory: NormalizerFactory,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    errors_sink: Optional[TextIO] = None,
+) -> NormalizeStats:
+    """Normalize ``source`` into ``sink`` (UTF-8) in constant memory.
+
+    Input is read with ``readinto`` into one reusable buffer of ``block_size``
+    bytes. Normalizers that provide ``push_into`` write into a reusable output
+    buffer; others fall back to ``push`` with a bytes copy of each block.
+    Error spans are streamed to ``errors_sink`` as JSONL when given.
+    """
+    normalizer = normalizer_factory()
+    stats = NormalizeStats()
+    block = bytearray(block_size)
+    view = memoryview(block)
+    out = bytearray()
+    push_into = getattr(normalizer, "push_into", None)
+    started = time.perf_counter()
+
+    while True:
+        size = source.readinto(block)
+        if not size:
+            break
+        stats.bytes_in += size
+        _push_block(normalizer, push_into, view[:size], out)
+        sink.write(out)
+        stats.bytes_out += len(out)
+        out.clear()
+        stats.errors += drain_errors(normalizer, errors_sink)
+
+    _finish_block(normalizer, out)
+    sink.write(out)
+    sink.flush()
+    stats.bytes_out += len(out)
+    stats.errors += drain_errors(normalizer, errors_sink)
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def normalize_file_mmap(
+    input_path: Path,
+    output_path: Path,
+    normalizer_factory: NormalizerFactory,
+    window: int = DEFAULT_MMAP_WINDOW,
+    errors_sink: Optional[TextIO] = None,
+) -> NormalizeStats:
+    """Normalize a file on disk by memory-mapping it instead of reading blocks.
+
+    The normalizer sees ``window``-sized memoryview slices of the mapping, so
+    no input bytes are copied into Python objects; output and error offsets
+    are those of ``push`` calls over the same slices, i.e. of
+    ``normalize_stream`` with ``block_size == window``. With other block sizes
+    they agree only if the normalizer's results do not depend on where the
+    input is split, as the scaffold's do not. The output file is preallocated
+    to the input size, written once per window (large writes bypass the io
+    buffer) and truncated to the final length.
+    """
+    normalizer = normalizer_factory()
+    stats = NormalizeStats()
+    out = bytearray()
+    push_into = getattr(normalizer, "push_into", None)
+    started = time.perf_counter()
+
+    with open(input_path, "rb") as source, open(output_path, "wb") as sink:
+        size = os.fstat(source.fileno()).st_size
+        if size and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(sink.fileno(), 0, size)
+            except OSError:
+                pass  # not supported by this filesystem; plain writes still work
+        if size:
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, "madvise"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mapped) as view:
+                    for start in range(0, size, window):
+                        chunk = view[start:start + window]
+                        _push_block(normalizer, push_into, chunk, out)
+                        chunk.release()
+                        sink.write(out)
+                        stats.bytes_out += len(out)
+                        out.clear()
+                        stats.errors += drain_errors(normalizer, errors_sink)
+        stats.bytes_in = size
+        _finish_block(normalizer, out)
+        sink.write(out)
+        stats.bytes_out += len(out)
+        sink.truncate(stats.bytes_out)
+    stats.errors += drain_errors(normalizer, errors_sink)
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def _push_block(normalizer: object, push_into, block: memoryview, out: bytearray) -> None:
+    if push_into is not None:
+        push_into(block, out)
+    else:
+        out += normalizer.push(bytes(block)).encode("utf-8")
+
+
+def _finish_block(normalizer: object, out: bytearray) -> None:
+    finish_into = getattr(normalizer, "finish_into", None)
+    if finish_into is not None:
+        finish_into(out)
+    else:
+        out += normalizer.finish().encode("utf-8")
+
+
+def find_shard_boundary(data, target: int, flags: Optional[Callable[[int], int]] = None) -> int:
+    """Return the first safe cut point at or after ``target``, or -1.
+
+    A cut at ``p`` is safe when a normalizer started fresh at ``p`` produces
+    exactly the bytes and errors the serial path would from there on:
+      - no lead byte in the 3 bytes before ``p`` announces a sequence reaching
+        past ``p``, so the left shard never ends on an incomplete (or malformed
+        but not yet decidable) sequence
+      - ``data[p]`` starts a valid sequence whose char is a stable NFC
+        boundary: a starter that cannot compose backward, which also rules out
+        Hangul V/T jamo after a Jamo L/V
+    ``flags`` is the solution's ``code_point_flags`` (BOUNDARY == 0x02); without
+    it only ASCII cuts are taken.
+    """
+    size = len(data)
+    end = min(size, target + MAX_BOUNDARY_SCAN)
+    for p in range(max(target, 1), end):
+        lead = data[p]
+        if 0x80 <= lead <= 0xBF or _straddles(data, p):
+            continue
+        if lead < 0x80:
+            return p
+        if flags is None:
+            continue
+        length = _sequence_length(lead)
+        if not length or p + length > size:
+            continue
+        try:
+            current = bytes(data[p:p + length]).decode("utf-8")
+        except UnicodeDecodeError:
+            continue
+        if flags(ord(current)) & _BOUNDARY:
+            return p
+    return -1
+
+
+def _sequence_length(lead: int) -> int:
+    if lead < 0x80:
+        return 1
+    if 0xC2 <= lead <= 0xDF:
+        return 2
+    if 0xE0 <= lead <= 0xEF:
+        return 3
+    if 0xF0 <= lead <= 0xF4:
+        return 4
+    return 0
+
+
+def _straddles(data, pos: int) -> bool:
+    # Lead bytes as a length-driven decoder sees them (C0/C1 still wait for 2).
+    for back in range(1, min(pos, 3) + 1):
+        lead = data[pos - back]
+        if 0xC0 <= lead <= 0xDF:
+            needed = 2
+        elif 0xE0 <= lead <= 0xEF:
+            needed = 3
+        elif 0xF0 <= lead <= 0xF4:
+            needed = 4
+        else:
+            continue
+        if needed > back:
+            return True
+    return False
+
+
+def plan_shards(data, shard_size: int, flags: Optional[Callable[[int], int]] = None) -> List[Tuple[int, int]]:
+    """Split ``data`` into ``(start, end)`` shards cut at safe boundaries."""
+    shards = []
+    start = 0
+    size = len(data)
+    while size - start > shard_size:
+        cut = find_shard_boundary(data, start + shard_size, flags)
+        if cut < 0:
+            break
+        shards.append((start, cut))
+        start = cut
+    shards.append((start, size))
+    return shards
+
+
+def _normalize_shard(solution_path: str, input_path: str, start: int, end: int):
+    """Worker: normalize ``input[start:end]`` with a fresh normalizer."""
+    normalizer = load_normalizer(Path(solution_path))()
+    push_into = getattr(normalizer, "push_into", None)
+    out = bytearray()
+    if start == end:
+        _finish_block(normalizer, out)
+        return bytes(out), []
+    with open(input_path, "rb") as source:
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                for offset in range(start, end, DEFAULT_MMAP_WINDOW):
+                    chunk = view[offset:min(end, offset + DEFAULT_MMAP_WINDOW)]
+                    _push_block(normalizer, push_into, chunk, out)
+                    chunk.release()
+    _finish_block(normalizer, out)
+    return bytes(out), list(_error_records(normalizer.errors, start))
+
+
+def normalize_parallel(
+    input_path: Path,
+    output_path: Path,
+    solution_path: Path,
+    workers: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    errors_sink: Optional[TextIO] = None,
+) -> NormalizeStats:
+    """Normalize a large file on several cores.
+
+    The input is cut into shards at safe boundaries (see
+    ``find_shard_boundary``), each shard is normalized by a fresh
+    ``Utf8StreamNormalizer`` in a process pool, and results are stitched
+    back in order with error spans shifted to global byte offsets. At most
+    two shards per worker are in flight, which bounds memory.
+
+    The stitched result equals one serial normalizer pushing every shard in
+    ``DEFAULT_MMAP_WINDOW`` slices. It equals ``normalize_stream`` and
+    ``normalize_file_mmap`` at other block sizes only for a normalizer whose
+    output and spans do not depend on where the input is split (the
+    scaffold's do not; one that ends a corrupt run at every push does not).
+    """
+    stats = NormalizeStats()
+    started = time.perf_counter()
+    solution_path = Path(solution_path).resolve()
+    flags = getattr(load_solution_module(solution_path), "code_point_flags", None)
+    workers = workers or os.cpu_count() or 1
+
+    with open(input_path, "rb") as source:
+        stats.bytes_in = os.fstat(source.fileno()).st_size
+        if stats.bytes_in:
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                shards = plan_shards(mapped, shard_size, flags)
+        else:
+            shards = [(0, 0)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output_path, "wb") as sink:
+        pending = []
+        for start, end in shards:
+            pending.append(pool.submit(_normalize_shard, str(solution_path), str(input_path), start, end))
+            if len(pending) >= 2 * workers:
+                _collect_shard(pending.pop(0), sink, errors_sink, stats)
+        for future in pending:
+            _collect_shard(future, sink, errors_sink, stats)
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def _collect_shard(future, sink: BinaryIO, errors_sink: Optional[TextIO], stats: NormalizeStats) -> None:
+    output, errors = future.result()
+    sink.write(output)
+    stats.bytes_out += len(output)
+    stats.errors += len(errors)
+    if errors_sink is not None:
+        for record in errors:
+            errors_sink.write(json.dumps(record) + "\n")
@@ -0,0 +1,62 @@
+"""asyncio adapter feeding a Utf8StreamNormalizer from a StreamReader."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterator, List, Optional, Tuple
+
+from .normalize import DEFAULT_BLOCK_SIZE
+
+# Chunks at least this large are pushed on an executor thread.
+DEFAULT_OFFLOAD_THRESHOLD = 1 << 14
+
+
+class AsyncStreamNormalizer:
+    """Yield normalized text from an ``asyncio.StreamReader`` as bytes arrive.
+
+    Iteration is pull-based: the reader is only read when the consumer asks
+    for the next piece, so a slow consumer leaves bytes in the reader, whose
+    buffer limit then pauses the transport (backpressure). Chunks of
+    ``offload_threshold`` bytes or more are pushed on ``executor`` (the loop's
+    default thread pool when ``None``) so a large pure-Python ``push`` does not
+    stall other connections. Pushes stay strictly sequential, so ``errors``
+    keeps the normalizer's global byte offsets.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        normalizer: object,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.reader = reader
+        self.normalizer = normalizer
+        self.block_size = block_size
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+
+    @property
+    def errors(self) -> List[Tuple[int, int]]:
+        return self.normalizer.errors
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await self.reader.read(self.block_size)
+            if not chunk:
+                break
+            if len(chunk) >= self.offload_threshold:
+                text = await loop.run_in_executor(self.executor, self.normalizer.push, chunk)
+            else:
+                text = self.normalizer.push(chunk)
+            if text:
+                yield text
+        text = self.normalizer.finish()
+        if text:
+            yield text
@@ -0,0 +1,87 @@
+"""Append-only JSONL log of experiment trial payloads."""
+
+from __future__ import annotations
+
+import json
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Sequence
+
+RESULTS_LOG_FILENAME = "automated_results.jsonl"
+_UNSET = (1 << 64) - 1  # offset slot not appended yet
+
+
+class ResultsLog(Sequence):
+    """Trial payloads in a JSONL file, read back from disk on access.
+
+    The first line holds the run metadata (``generated_at``, ``model_name``,
+    ``notes``); every further line is one trial payload, flushed as soon as
+    it is appended, so a crashed sweep keeps all finished trials. Only the
+    byte offset of each line stays in memory (eight bytes per trial).
+
+    A log created with ``slots`` is indexed by slot, whatever order trials
+    finish in; ``ResultsLog.read`` opens an existing file in line order.
+    """
+
+    def __init__(self, path: Path, metadata: Dict[str, object], slots: int = 0) -> None:
+        self.path = Path(path)
+        self.metadata = dict(metadata)
+        self._offsets = array("Q", [_UNSET]) * slots
+        self._handle: Optional[BinaryIO] = self.path.open("wb")
+        self._write(self.metadata)
+
+    @classmethod
+    def read(cls, path: Path) -> "ResultsLog":
+        log = cls.__new__(cls)
+        log.path = Path(path)
+        log._offsets = array("Q")
+        log._handle = None
+        with log.path.open("rb") as handle:
+            log.metadata = json.loads(handle.readline() or b"{}")
+            offset = handle.tell()
+            for line in iter(handle.readline, b""):
+                if line.endswith(b"\n"):  # a torn last line from a crash is skipped
+                    log._offsets.append(offset)
+                offset += len(line)
+        return log
+
+    def _write(self, record: Dict[str, object]) -> int:
+        offset = self._handle.tell()
+        self._handle.write(json.dumps(record).encode("utf-8") + b"\n")
+        self._handle.flush()
+        return offset
+
+    def append(self, slot: int, payload: Dict[str, object]) -> None:
+        self._offsets[slot] = self._write(payload)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> "ResultsLog":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _load(self, handle: BinaryIO, offset: int) -> Dict[str, object]:
+        if offset == _UNSET:
+            raise LookupError(f"trial not appended to {self.path} yet")
+        handle.seek(offset)
+        return json.loads(handle.readline())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        offset = self._offsets[index]
+        with self.path.open("rb") as handle:
+            return self._load(handle, offset)
+
+    def __iter__(self) -> Iterator[Dict[str, object]]:
+        with self.path.open("rb") as handle:
+            for offset in self._offsets:
+                yield self._load(handle, offset)
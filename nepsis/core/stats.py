@@ -0,0 +1,75 @@
+"""Distribution summaries for multi-trial experiment sweeps."""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, Iterable, List, Mapping, Sequence
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Linearly interpolated percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def bootstrap_mean_ci(
+    values: Sequence[float],
+    confidence: float = DEFAULT_CONFIDENCE,
+    resamples: int = DEFAULT_RESAMPLES,
+    seed: int = 0,
+) -> tuple:
+    """Percentile bootstrap confidence interval of the mean, seeded for reproducible reports."""
+    if not values:
+        return 0.0, 0.0
+    rng = random.Random(seed)
+    count = len(values)
+    means = sorted(sum(rng.choices(values, k=count)) / count for _ in range(resamples))
+    tail = (1.0 - confidence) / 2
+    return percentile(means, tail), percentile(means, 1.0 - tail)
+
+
+def describe(values: Iterable[float], confidence: float = DEFAULT_CONFIDENCE) -> Dict[str, float]:
+    """n, mean, p50, p95 and a bootstrap CI of the mean."""
+    ordered = sorted(values)
+    ci_low, ci_high = bootstrap_mean_ci(ordered, confidence)
+    return {
+        "n": len(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+    }
+
+
+def summarize_trials(payloads: Iterable[Mapping[str, object]]) -> Dict[str, Dict[str, object]]:
+    """Per-condition pass-rate and runtime distributions over trial payloads.
+
+    A trial's pass rate is passed / (passed + failed + errors); ``all_passed``
+    is the fraction of trials with no failures or errors at all.
+    """
+    pass_rates: Dict[str, List[float]] = {}
+    runtimes: Dict[str, List[float]] = {}
+    for payload in payloads:
+        condition = str(payload["condition"])
+        tests = payload.get("tests", {})
+        total = tests.get("passed", 0) + tests.get("failed", 0) + tests.get("errors", 0)
+        pass_rates.setdefault(condition, []).append(tests.get("passed", 0) / total if total else 0.0)
+        runtimes.setdefault(condition, []).append(float(payload.get("seconds", 0.0)))
+
+    return {
+        condition: {
+            "trials": len(rates),
+            "all_passed": sum(rate == 1.0 for rate in rates) / len(rates),
+            "pass_rate": describe(rates),
+            "runtime_seconds": describe(runtimes[condition]),
+        }
+        for condition, rates in pass_rates.items()
+    }
@@ -1,22 +1,379 @@
 """STILL logger capturing metacognitive checkpoints."""
 
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_MAX_EVENTS = 1024
+DEFAULT_FLUSH_EVERY = 256
+DEFAULT_FLUSH_INTERVAL = 1.0
+# fsync policies: never, once when the logger closes, or after every write/flush.
+FSYNC_NEVER = "never"
+FSYNC_ON_CLOSE = "close"
+FSYNC_ON_FLUSH = "flush"
+FSYNC_POLICIES = (FSYNC_NEVER, FSYNC_ON_CLOSE, FSYNC_ON_FLUSH)
+
+# Sidecar index of a structured log: a magic header, then one fixed-size
+# record per line (timestamp key in ns, byte offset of the line, CRC-32 of
+# the event type). Keys never decrease, so time ranges can be bisected.
+_INDEX_MAGIC = b"NSTILX1\n"
+_INDEX = struct.Struct("<qQI")
+_INDEX_BATCH = 4096  # index records read per chunk while scanning a range
+
+# (line, timestamp in ns, event type) waiting to be written
+_Entry = Tuple[str, int, str]
+
+
+def index_path(path: Path) -> Path:
+    """Sidecar index written next to a structured STILL log."""
+    return path.with_name(path.name + ".idx")
+
+
+def event_code(event: str) -> int:
+    return zlib.crc32(event.encode("utf-8"))
+
+
+def _utc_iso(ts_ns: int) -> str:
+    moment = datetime.fromtimestamp(ts_ns / 1e9, timezone.utc).replace(tzinfo=None)
+    return moment.isoformat() + "Z"
 
 
 @dataclass
 class StillLogger:
-    """Append strategic time-in-loop events to a log file."""
+    """Append strategic time-in-loop events to a log file.
+
+    By default every ``log`` call appends its line to ``path`` immediately and
+    ``events`` keeps every entry. With ``buffered`` the file stays open and
+    lines are written in batches once ``flush_every`` are pending or
+    ``flush_interval`` seconds have passed since the last write (checked on
+    each ``log``), and always on ``flush``/``close``. ``events`` then becomes
+    a ring buffer of the last ``max_events`` entries (``DEFAULT_MAX_EVENTS``
+    unless given; ``max_events`` bounds the unbuffered logger too).
+
+    ``background`` moves the batched writes to a daemon thread, which also
+    applies ``flush_interval`` while no one is logging; ``log`` then only
+    appends to the pending batch. ``fsync`` is one of ``FSYNC_POLICIES``;
+    unbuffered, ``FSYNC_ON_FLUSH`` syncs every line and ``FSYNC_ON_CLOSE``
+    has nothing to do. Call ``close`` (or use the logger as a context
+    manager) so the last batch reaches the file.
+
+    With ``structured`` every line is a JSON object (see ``record``) and a
+    sidecar index (``index_path``) is kept alongside, which
+    ``read_still_log`` uses to seek straight to a time range or event type.
+    """
 
     path: Path
     events: List[str] = field(default_factory=list)
+    buffered: bool = False
+    max_events: Optional[int] = None
+    flush_every: int = DEFAULT_FLUSH_EVERY
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    fsync: str = FSYNC_NEVER
+    background: bool = False
+    structured: bool = False
+    _pending: List[_Entry] = field(default_factory=list, init=False, repr=False, compare=False)
+    _handle: Optional[IO[bytes]] = field(default=None, init=False, repr=False, compare=False)
+    _index_handle: Optional[IO[bytes]] = field(default=None, init=False, repr=False, compare=False)
+    _index_key: int = field(default=0, init=False, repr=False, compare=False)  # last timestamp key indexed
+    _last_flush: float = field(default=0.0, init=False, repr=False, compare=False)
+    _lock: threading.Condition = field(default_factory=threading.Condition, init=False, repr=False, compare=False)
+    _writer: Optional[threading.Thread] = field(default=None, init=False, repr=False, compare=False)
+    _closed: bool = field(default=False, init=False, repr=False, compare=False)
+    _requested: int = field(default=0, init=False, repr=False, compare=False)  # flush() tickets issued
+    _completed: int = field(default=0, init=False, repr=False, compare=False)  # ... and written
+
+    def __post_init__(self) -> None:
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_POLICIES)}, not {self.fsync!r}")
+        if self.background and not self.buffered:
+            raise ValueError("background writing requires buffered=True")
+        max_events = self.max_events
+        if max_events is None and self.buffered:
+            max_events = DEFAULT_MAX_EVENTS
+        if max_events is not None:
+            self.events = deque(self.events, maxlen=max_events)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._last_flush = time.monotonic()
+        if self.background:
+            self._writer = threading.Thread(target=self._run_writer, name=f"still-{self.path.name}", daemon=True)
+            self._writer.start()
 
     def log(self, message: str) -> None:
+        if self.structured:
+            self.record("message", message=message)
+            return
         timestamp = datetime.utcnow().isoformat() + "Z"
-        entry = f"{timestamp} | {message}"
-        self.events.append(entry)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        with self.path.open("a", encoding="utf-8") as handle:
-            handle.write(entry + "\n")
+        self._emit((f"{timestamp} | {message}", 0, "message"))
+
+    def record(self, event: str, scenario: str = "", **fields: object) -> None:
+        """Log an ``event`` of a ``scenario`` with JSON-serialisable ``fields``.
+
+        Structured loggers write ``{"ts", "time", "event", "scenario", **fields}``
+        with ``ts`` in integer nanoseconds since the epoch; text loggers write
+        ``time | event [scenario] key=value ...``.
+        """
+        ts = time.time_ns()
+        if self.structured:
+            line = json.dumps(
+                {"ts": ts, "time": _utc_iso(ts), "event": event, "scenario": scenario, **fields},
+                separators=(",", ":"),
+            )
+        else:
+            details = "".join(f" {key}={value}" for key, value in fields.items())
+            line = f"{_utc_iso(ts)} | {event}{f' [{scenario}]' if scenario else ''}{details}"
+        self._emit((line, ts, event))
+
+    def _emit(self, entry: _Entry) -> None:
+        if not self.buffered:
+            self.events.append(entry[0])
+            self._write([entry])
+            self._close_handles(self.fsync == FSYNC_ON_FLUSH)
+            return
+
+        with self._lock:
+            if self._closed:
+                raise ValueError("log on closed StillLogger")
+            self.events.append(entry[0])
+            self._pending.append(entry)
+            if not self._due():
+                return
+            if self.background:
+                self._lock.notify_all()
+            else:
+                self._write(self._take())
+
+    def flush(self) -> None:
+        """Write every pending line; with ``background``, wait for the writer to do it."""
+        if not self.buffered:
+            return
+        with self._lock:
+            if not self.background:
+                self._write(self._take())
+                return
+            self._requested += 1
+            ticket = self._requested
+            self._lock.notify_all()
+            while self._completed < ticket and self._writer.is_alive():
+                self._lock.wait()
+
+    def close(self) -> None:
+        if not self.buffered:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._lock.notify_all()
+            if not self.background:
+                self._write(self._take())
+        if self._writer is not None:
+            self._writer.join()
+        self._close_handles(self.fsync != FSYNC_NEVER)
+
+    def __enter__(self) -> "StillLogger":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def _due(self) -> bool:
+        return len(self._pending) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval
+
+    def _take(self) -> List[_Entry]:
+        # Caller holds self._lock.
+        batch, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        return batch
+
+    def _open(self) -> None:
+        self._handle = self.path.open("ab")
+        if not self.structured:
+            return
+        index = index_path(self.path)
+        if self._handle.tell() and (not index.exists() or index.stat().st_size <= len(_INDEX_MAGIC)):
+            build_still_index(self.path)  # a log written before indexing started
+        self._index_handle = index.open("ab")
+        if not self._index_handle.tell():
+            self._index_handle.write(_INDEX_MAGIC)
+        elif self._index_handle.tell() >= len(_INDEX_MAGIC) + _INDEX.size:
+            with index.open("rb") as reader:
+                reader.seek(-_INDEX.size, os.SEEK_END)
+                self._index_key = _INDEX.unpack(reader.read(_INDEX.size))[0]
+
+    def _write(self, batch: List[_Entry]) -> None:
+        # Only one thread writes: the caller (under self._lock) or the background writer.
+        if not batch:
+            return
+        if self._handle is None:
+            self._open()
+        offset = self._handle.tell()
+        data = bytearray()
+        index = bytearray()
+        for line, ts, event in batch:
+            if self._index_handle is not None:
+                self._index_key = max(self._index_key, ts)  # clock steps back: keep keys sorted
+                index += _INDEX.pack(self._index_key, offset + len(data), event_code(event))
+            data += line.encode("utf-8") + b"\n"
+        # Data before index: an entry never points past the end of the log.
+        self._handle.write(data)
+        self._handle.flush()
+        if self._index_handle is not None:
+            self._index_handle.write(index)
+            self._index_handle.flush()
+        if self.fsync == FSYNC_ON_FLUSH and self.buffered:
+            os.fsync(self._handle.fileno())
+            if self._index_handle is not None:
+                os.fsync(self._index_handle.fileno())
+
+    def _close_handles(self, sync: bool) -> None:
+        for handle in (self._handle, self._index_handle):
+            if handle is not None:
+                if sync:
+                    os.fsync(handle.fileno())
+                handle.close()
+        self._handle = self._index_handle = None
+
+    def _run_writer(self) -> None:
+        closing = False
+        while not closing:
+            with self._lock:
+                if not (self._closed or self._requested > self._completed or len(self._pending) >= self.flush_every):
+                    self._lock.wait(self.flush_interval)
+                ticket, closing = self._requested, self._closed
+                batch = self._take()
+            self._write(batch)  # outside the lock: log() never waits on file I/O
+            with self._lock:
+                self._completed = ticket
+                self._lock.notify_all()
+
+
+def _parse_line(line: bytes) -> Optional[Dict[str, object]]:
+    """A structured record, or a text ``time | message`` line as a "message" event."""
+    text = line.decode("utf-8", errors="replace").rstrip("\n")
+    if text.startswith("{"):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None  # torn last line of a crashed writer
+    stamp, separator, message = text.partition(" | ")
+    if not separator:
+        return None
+    try:
+        moment = datetime.fromisoformat(stamp.rstrip("Z")).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    ts = int(moment.timestamp()) * 1_000_000_000 + moment.microsecond * 1000
+    return {"ts": ts, "time": stamp, "event": "message", "scenario": "", "message": message}
+
+
+def _matches(
+    record: Dict[str, object],
+    start: Optional[int],
+    end: Optional[int],
+    events: Optional[frozenset],
+    scenario: Optional[str],
+) -> bool:
+    ts = record.get("ts", 0)
+    return (
+        (start is None or ts >= start)
+        and (end is None or ts <= end)
+        and (events is None or record.get("event") in events)
+        and (scenario is None or record.get("scenario") == scenario)
+    )
+
+
+def build_still_index(path: Path) -> int:
+    """(Re)write the sidecar index of a structured log by scanning it once; return its entries."""
+    key = 0
+    count = 0
+    with path.open("rb") as data, index_path(path).open("wb") as index:
+        index.write(_INDEX_MAGIC)
+        offset = 0
+        for line in data:
+            record = _parse_line(line) if line.endswith(b"\n") else None
+            if record is not None:
+                key = max(key, int(record.get("ts", 0)))
+                index.write(_INDEX.pack(key, offset, event_code(str(record.get("event", "")))))
+                count += 1
+            offset += len(line)
+    return count
+
+
+def read_still_log(
+    path: Path,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    events: Optional[Iterable[str]] = None,
+    scenario: Optional[str] = None,
+) -> Iterator[Dict[str, object]]:
+    """Yield records with ``start <= ts <= end`` (ns), of ``events``, in ``scenario``.
+
+    With a sidecar index the first record at or after ``start`` is found by
+    bisecting the index, the range is walked through the index alone, and
+    only lines whose event type matches are read from the log, one at a
+    time. Lines past the last indexed one (a writer that crashed between
+    the two files) are scanned. Without an index the whole log is scanned,
+    text-format lines included.
+    """
+    wanted = frozenset(events) if events else None
+    codes = {event_code(event) for event in wanted} if wanted else None
+    index_file = index_path(path)
+    with path.open("rb") as data:
+        if not index_file.exists():
+            for line in data:
+                record = _parse_line(line)
+                if record is not None and _matches(record, start, end, wanted, scenario):
+                    yield record
+            return
+
+        with index_file.open("rb") as index:
+            if index.read(len(_INDEX_MAGIC)) != _INDEX_MAGIC:
+                raise ValueError(f"{index_file} is not a STILL log index")
+            header = len(_INDEX_MAGIC)
+            count = (os.fstat(index.fileno()).st_size - header) // _INDEX.size
+
+            def entry(position: int) -> Tuple[int, int, int]:
+                index.seek(header + position * _INDEX.size)
+                return _INDEX.unpack(index.read(_INDEX.size))
+
+            low, high = 0, count
+            while start is not None and low < high:
+                middle = (low + high) // 2
+                if entry(middle)[0] < start:
+                    low = middle + 1
+                else:
+                    high = middle
+            tail = entry(count - 1)[1] if count else None
+
+            index.seek(header + low * _INDEX.size)
+            remaining = count - low
+            while remaining:
+                chunk = index.read(_INDEX.size * min(remaining, _INDEX_BATCH))
+                remaining -= len(chunk) // _INDEX.size
+                for key, offset, code in _INDEX.iter_unpack(chunk):
+                    if end is not None and key > end:
+                        return
+                    if codes is not None and code not in codes:
+                        continue
+                    data.seek(offset)
+                    record = _parse_line(data.readline())
+                    if record is not None and _matches(record, start, end, wanted, scenario):
+                        yield record
+
+        if tail is None:
+            data.seek(0)
+        else:
+            data.seek(tail)
+            data.readline()
+        for line in data:
+            record = _parse_line(line)
+            if record is not None and _matches(record, start, end, wanted, scenario):
+                yield record
@@ -0,0 +1,235 @@
+"""SQLite store of experiment trials for queries across many runs."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+RESULTS_STORE_FILENAME = "results.sqlite"
+GROUP_COLUMNS = ("model_name", "condition", "solution_sha256", "run")
+# Groupings answered from the per-run rollup rather than the trials table.
+_ROLLUP_COLUMNS = ("model_name", "condition", "run")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    id INTEGER PRIMARY KEY,
+    run TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    model_name TEXT NOT NULL,
+    notes TEXT NOT NULL,
+    condition TEXT NOT NULL,
+    trial_id TEXT NOT NULL,
+    solution TEXT NOT NULL,
+    solution_sha256 TEXT NOT NULL,
+    returncode INTEGER,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    seconds REAL,
+    cached INTEGER NOT NULL,
+    mb_per_s REAL,
+    push_p50_ns INTEGER,
+    push_p99_ns INTEGER,
+    peak_rss_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS trials_condition ON trials (condition);
+CREATE INDEX IF NOT EXISTS trials_model_name ON trials (model_name, condition);
+CREATE INDEX IF NOT EXISTS trials_solution ON trials (solution_sha256);
+CREATE INDEX IF NOT EXISTS trials_recorded_at ON trials (recorded_at);
+CREATE TABLE IF NOT EXISTS run_conditions (
+    run TEXT NOT NULL,
+    condition TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    trials INTEGER NOT NULL,
+    all_passed INTEGER NOT NULL,
+    pass_rate_sum REAL NOT NULL,
+    seconds_sum REAL NOT NULL,
+    benchmarked INTEGER NOT NULL,
+    mb_per_s_sum REAL NOT NULL,
+    push_p99_ns INTEGER,
+    peak_rss_bytes INTEGER,
+    PRIMARY KEY (run, condition)
+);
+CREATE INDEX IF NOT EXISTS run_conditions_model_name ON run_conditions (model_name, condition);
+CREATE INDEX IF NOT EXISTS run_conditions_started_at ON run_conditions (started_at);
+"""
+
+_ROLLUP_UPSERT = """
+INSERT INTO run_conditions VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (run, condition) DO UPDATE SET
+    trials = trials + 1,
+    all_passed = all_passed + excluded.all_passed,
+    pass_rate_sum = pass_rate_sum + excluded.pass_rate_sum,
+    seconds_sum = seconds_sum + excluded.seconds_sum,
+    benchmarked = benchmarked + excluded.benchmarked,
+    mb_per_s_sum = mb_per_s_sum + excluded.mb_per_s_sum,
+    push_p99_ns = MAX(COALESCE(push_p99_ns, excluded.push_p99_ns), COALESCE(excluded.push_p99_ns, push_p99_ns)),
+    peak_rss_bytes = MAX(
+        COALESCE(peak_rss_bytes, excluded.peak_rss_bytes), COALESCE(excluded.peak_rss_bytes, peak_rss_bytes)
+    )
+"""
+
+
+class ResultsStore:
+    """One row per trial: identity, test counts and benchmark scores.
+
+    Full stdout and per-test cases stay in the JSONL log; the store keeps the
+    numeric columns that aggregate queries need, indexed by condition,
+    model, solution hash and time. Each insert also updates running sums in
+    ``run_conditions`` (one row per run and condition), so pass rates per
+    model/condition/run and throughput trends read a few rows per run
+    instead of scanning every trial; only grouping by solution hash does.
+
+    A cache hit (``"cached": true``) repeats a trial stored earlier: it is
+    kept in ``trials`` with ``cached = 1`` but left out of the rollup and of
+    every aggregate, so rerunning unchanged candidates does not count twice.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def record(self, metadata: Mapping[str, object], payload: Mapping[str, object]) -> None:
+        """Insert one trial payload of the run described by ``metadata`` and commit."""
+        tests = payload.get("tests", {})
+        performance = payload.get("performance", {})
+        recorded_at = time.time()
+        cached = bool(payload.get("cached"))
+        passed = tests.get("passed", 0)
+        total = passed + tests.get("failed", 0) + tests.get("errors", 0)
+        mb_per_s = performance.get("mb_per_s")
+        if not cached:
+            self.connection.execute(
+                _ROLLUP_UPSERT,
+                (
+                    str(metadata.get("generated_at", "")),
+                    str(payload.get("condition", "")),
+                    str(metadata.get("model_name", "")),
+                    recorded_at,
+                    int(total > 0 and passed == total),
+                    passed / total if total else 0.0,
+                    payload.get("seconds") or 0.0,
+                    int(mb_per_s is not None),
+                    mb_per_s or 0.0,
+                    performance.get("push_p99_ns"),
+                    performance.get("peak_rss_bytes"),
+                ),
+            )
+        self.connection.execute(
+            "INSERT INTO trials (run, recorded_at, model_name, notes, condition, trial_id, solution,"
+            " solution_sha256, returncode, passed, failed, errors, seconds, cached,"
+            " mb_per_s, push_p50_ns, push_p99_ns, peak_rss_bytes)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(metadata.get("generated_at", "")),
+                recorded_at,
+                str(metadata.get("model_name", "")),
+                str(metadata.get("notes", "")),
+                str(payload.get("condition", "")),
+                str(payload.get("trial_id", "")),
+                str(payload.get("solution", "")),
+                str(payload.get("solution_sha256", "")),
+                payload.get("returncode"),
+                tests.get("passed", 0),
+                tests.get("failed", 0),
+                tests.get("errors", 0),
+                payload.get("seconds"),
+                int(cached),
+                performance.get("mb_per_s"),
+                performance.get("push_p50_ns"),
+                performance.get("push_p99_ns"),
+                performance.get("peak_rss_bytes"),
+            ),
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def _where(
+        model_name: Optional[str], condition: Optional[str], since: Optional[float], time_column: str
+    ) -> tuple:
+        clauses, parameters = [], []
+        if model_name is not None:
+            clauses.append("model_name = ?")
+            parameters.append(model_name)
+        if condition is not None:
+            clauses.append("condition = ?")
+            parameters.append(condition)
+        if since is not None:
+            clauses.append(f"{time_column} >= ?")
+            parameters.append(since)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), parameters
+
+    def _query(self, sql: str, parameters: Sequence[object]) -> List[Dict[str, object]]:
+        return [dict(row) for row in self.connection.execute(sql, parameters)]
+
+    def pass_rates(
+        self,
+        group_by: Sequence[str] = ("model_name", "condition"),
+        model_name: Optional[str] = None,
+        condition: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> List[Dict[str, object]]:
+        """Trials, all-passed fraction, mean pass rate and mean runtime per group.
+
+        ``since`` (a Unix time) keeps runs started at or after it, or single
+        trials recorded at or after it when grouping by solution hash. Cache
+        hits are not counted.
+        """
+        unknown = set(group_by) - set(GROUP_COLUMNS)
+        if unknown:
+            raise ValueError(f"cannot group by {', '.join(sorted(unknown))}; choose from {', '.join(GROUP_COLUMNS)}")
+        columns = ", ".join(group_by)
+        grouping = f" GROUP BY {columns} ORDER BY {columns}" if columns else ""
+        selected = columns + ", " if columns else ""
+        if set(group_by) <= set(_ROLLUP_COLUMNS):
+            where, parameters = self._where(model_name, condition, since, "started_at")
+            return self._query(
+                f"SELECT {selected}SUM(trials) AS trials,"
+                " CAST(SUM(all_passed) AS REAL) / SUM(trials) AS all_passed,"
+                " SUM(pass_rate_sum) / SUM(trials) AS pass_rate,"
+                " SUM(seconds_sum) / SUM(trials) AS mean_seconds"
+                f" FROM run_conditions{where}{grouping}",
+                parameters,
+            )
+        where, parameters = self._where(model_name, condition, since, "recorded_at")
+        where += (" AND " if where else " WHERE ") + "cached = 0"
+        return self._query(
+            f"SELECT {selected}COUNT(*) AS trials,"
+            " AVG(failed = 0 AND errors = 0 AND passed > 0) AS all_passed,"
+            " AVG(CAST(passed AS REAL) / MAX(passed + failed + errors, 1)) AS pass_rate,"
+            " AVG(seconds) AS mean_seconds"
+            f" FROM trials{where}{grouping}",
+            parameters,
+        )
+
+    def throughput_trend(
+        self,
+        model_name: Optional[str] = None,
+        condition: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> List[Dict[str, object]]:
+        """Mean MB/s, worst push p99 and peak RSS per run and condition, oldest run first."""
+        where, parameters = self._where(model_name, condition, since, "started_at")
+        where += (" AND " if where else " WHERE ") + "benchmarked > 0"
+        return self._query(
+            "SELECT run, model_name, condition, benchmarked AS trials, mb_per_s_sum / benchmarked AS mb_per_s,"
+            " push_p99_ns, peak_rss_bytes"
+            f" FROM run_conditions{where} ORDER BY started_at, condition",
+            parameters,
+        )
@@ -1,19 +1,46 @@
 """Basic scaffolding tests for Nepsis core modules."""
 
+import asyncio
+import io
+import json
+import sys
+import threading
+import time
 from pathlib import Path
 
 from subprocess import CompletedProcess
 
 from nepsis.core import (
+    AsyncStreamNormalizer,
     BlueChannel,
     CollapseGovernor,
     ConditionSpec,
     ExperimentRunner,
     RedChannel,
+    ResultsLog,
+    ResultsStore,
+    ResultCache,
     StillLogger,
     ZeroBackController,
+    build_corpus,
+    build_still_index,
+    describe,
+    discover_candidates,
+    index_path,
+    load_normalizer,
+    normalize_file_mmap,
+    normalize_parallel,
+    normalize_stream,
+    read_still_log,
+    run_benchmarks,
+    run_tests_in_process,
+    summarize_trials,
+    write_reports,
 )
 
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCAFFOLD_SOLUTION = REPO_ROOT / "solution_scaffold.py"
+
 
 def test_collapse_governor_default_mode():
     governor = CollapseGovernor()
@@ -41,6 +68,63 @@ def test_still_logger_writes(tmp_path):
     assert "test message" in log_path.read_text(encoding="utf-8")
 
 
+def test_still_logger_buffers_and_bounds_events(tmp_path):
+    log_path = tmp_path / "logs" / "still.log"
+    still = StillLogger(log_path, buffered=True, max_events=2, flush_every=3, flush_interval=3600)
+    still.log("a")
+    still.log("b")
+    assert not log_path.exists()
+    still.log("c")
+    assert [line.split(" | ")[1] for line in log_path.read_text(encoding="utf-8").splitlines()] == ["a", "b", "c"]
+    still.log("d")
+    assert [event.split(" | ")[1] for event in still.events] == ["c", "d"]
+    still.close()
+    assert log_path.read_text(encoding="utf-8").count("\n") == 4
+    try:
+        still.log("e")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("log after close should fail")
+
+    with StillLogger(log_path, buffered=True, background=True, fsync="flush", flush_interval=3600) as still:
+        for index in range(1100):
+            still.log(f"event {index}")
+        still.flush()
+        assert log_path.read_text(encoding="utf-8").count("\n") == 1104
+        still.log("last")
+    assert log_path.read_text(encoding="utf-8").endswith(" | last\n")
+    assert len(still.events) == 1024 and not still._writer.is_alive()
+
+
+def test_structured_still_log_index_queries(tmp_path):
+    log_path = tmp_path / "still.log"
+    with StillLogger(log_path, buffered=True, structured=True, flush_every=64) as still:
+        for index in range(500):
+            still.record("collapse-mode" if index % 50 == 0 else "tick", f"s{index % 2}", step=index, hijack_score=0.5)
+    records = list(read_still_log(log_path))
+    assert len(records) == 500 and records[3] == {
+        "ts": records[3]["ts"], "time": records[3]["time"], "event": "tick", "scenario": "s1", "step": 3,
+        "hijack_score": 0.5,
+    }
+    assert index_path(log_path).stat().st_size == 8 + 20 * 500
+
+    window = list(read_still_log(log_path, start=records[100]["ts"], end=records[199]["ts"]))
+    assert [r["step"] for r in window] == list(range(100, 200))
+    modes = list(read_still_log(log_path, events=["collapse-mode"], scenario="s0"))
+    assert [r["step"] for r in modes] == list(range(0, 500, 50))
+
+    # A crash between the log and index writes leaves unindexed lines: they are scanned.
+    with log_path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"ts": records[-1]["ts"] + 1, "event": "zero-back", "scenario": "s0"}) + "\n")
+    assert [r["event"] for r in read_still_log(log_path, start=records[-1]["ts"])] == ["tick", "zero-back"]
+    assert build_still_index(log_path) == 501
+
+    text_path = tmp_path / "text.log"
+    StillLogger(text_path).log("free-form entry")
+    assert [r["message"] for r in read_still_log(text_path, events=["message"])] == ["free-form entry"]
+
+
 def test_zero_back_controller_tracks_depth():
     controller = ZeroBackController(max_depth=2)
     controller.reset("a")
@@ -99,3 +183,450 @@ def test_experiment_runner_restores_solution(tmp_path):
     assert summary["conditions"][0]["tests"]["passed"] == 11
     assert (artifacts / "automated_results.json").exists()
     assert any("pytest" in " ".join(cmd) for cmd, _ in calls)
+
+
+def test_experiment_runner_isolates_concurrent_trials(tmp_path):
+    tests_file = tmp_path / "tests" / "test_stream_utf8_normalizer.py"
+    tests_file.parent.mkdir()
+    tests_file.write_text("# placeholder", encoding="utf-8")
+    (tmp_path / "solution.py").write_text("original", encoding="utf-8")
+    for name in ("naked", "scaffold"):
+        (tmp_path / f"solution_{name}.py").write_text(name, encoding="utf-8")
+
+    barrier = threading.Barrier(4)
+    seen = []
+
+    def fake_runner(cmd, cwd):
+        installed = (cwd / "solution.py").read_text(encoding="utf-8")
+        assert (cwd / "tests" / tests_file.name).exists() and cwd != tmp_path
+        seen.append(cwd)
+        barrier.wait(timeout=5)  # only returns if four runs overlap
+        passed = 11 if installed == "scaffold" else 8
+        return CompletedProcess(cmd, 0, stdout=f"{passed} passed in 0.01s", stderr="")
+
+    runner = ExperimentRunner(
+        tmp_path, tests_file, tmp_path / "artifacts", runner=fake_runner, benchmark=False, max_workers=4
+    )
+    conditions = [ConditionSpec(name, tmp_path / f"solution_{name}.py") for name in ("naked", "scaffold")]
+    summary = runner.run(conditions, trials=2)
+
+    assert [(c["condition"], c["trial"], c["tests"]["passed"]) for c in summary["conditions"]] == [
+        ("naked", 0, 8), ("naked", 1, 8), ("scaffold", 0, 11), ("scaffold", 1, 11)
+    ]
+    assert len(set(seen)) == 4 and not any(path.exists() for path in seen)
+    assert (tmp_path / "solution.py").read_text(encoding="utf-8") == "original"
+    assert (tmp_path / "artifacts" / "automated_scaffold-0001.json").exists()
+    assert [c["trial_id"] for c in summary["conditions"]] == [
+        "naked-0000", "naked-0001", "scaffold-0000", "scaffold-0001"
+    ]
+    statistics = summary["statistics"]
+    assert statistics["scaffold"]["all_passed"] == 1.0 and statistics["naked"]["trials"] == 2
+    rows = (tmp_path / "artifacts" / "automated_scorecard.csv").read_text(encoding="utf-8").splitlines()
+    assert sorted(row.split(",")[0] for row in rows[1:]) == ["naked-0000", "naked-0001", "scaffold-0000", "scaffold-0001"]
+
+
+def test_experiment_runner_benchmarks_run_alone(tmp_path):
+    tests_file = tmp_path / "test_stream_utf8_normalizer.py"
+    tests_file.write_text("# placeholder", encoding="utf-8")
+    names = ("a", "b", "c", "d")
+    for name in names:
+        (tmp_path / f"solution_{name}.py").write_text(name, encoding="utf-8")
+    lock = threading.Lock()
+    active = {"tests": 0, "benchmark": 0}
+    peaks = {"tests": 0, "overlap": 0}
+
+    def fake_runner(cmd, cwd):
+        kind = "benchmark" if "benchmark" in cmd else "tests"
+        with lock:
+            active[kind] += 1
+            peaks["tests"] = max(peaks["tests"], active["tests"])
+            if active["benchmark"] and sum(active.values()) > 1:
+                peaks["overlap"] += 1
+        time.sleep(0.02)
+        with lock:
+            active[kind] -= 1
+        stdout = '{"peak_rss_bytes": 1, "results": []}' if kind == "benchmark" else "1 passed in 0.01s"
+        return CompletedProcess(cmd, 0, stdout=stdout, stderr="")
+
+    runner = ExperimentRunner(
+        tmp_path, tests_file, tmp_path / "artifacts", runner=fake_runner, max_workers=4, cache=False
+    )
+    runner.run([ConditionSpec(name, tmp_path / f"solution_{name}.py") for name in names], trials=3)
+
+    assert peaks["overlap"] == 0 and peaks["tests"] > 1
+
+
+def test_experiment_runner_reuses_cached_results(tmp_path):
+    tests_file = tmp_path / "test_stream_utf8_normalizer.py"
+    tests_file.write_text("# placeholder", encoding="utf-8")
+    solution = tmp_path / "solution_naked.py"
+    solution.write_text("v1", encoding="utf-8")
+    calls = []
+
+    def fake_runner(cmd, cwd):
+        calls.append((cwd / "solution.py").read_text(encoding="utf-8"))
+        return CompletedProcess(cmd, 0, stdout="11 passed in 0.01s", stderr="")
+
+    def run(**options):
+        runner = ExperimentRunner(
+            tmp_path, tests_file, tmp_path / "artifacts", runner=fake_runner, benchmark=False, **options
+        )
+        return runner.run([ConditionSpec("naked", solution)], trials=2)["conditions"]
+
+    assert [c["cached"] for c in run()] == [False, False]
+    second = run()
+    assert calls == ["v1", "v1"] and [c["cached"] for c in second] == [True, True]
+    assert [c["trial_id"] for c in second] == ["naked-0000", "naked-0001"] and second[0]["tests"]["passed"] == 11
+
+    run(cache=False)
+    solution.write_text("v2", encoding="utf-8")
+    run()
+    assert calls == ["v1", "v1", "v1", "v1", "v2", "v2"]
+
+    cache = ResultCache(tmp_path / "artifacts" / "cache", max_entries=3)
+    assert cache.prune() == 1 and len(list(cache.directory.glob("*.json"))) == 3
+
+
+def test_experiment_runner_appends_results_log(tmp_path):
+    tests_file = tmp_path / "test_stream_utf8_normalizer.py"
+    tests_file.write_text("# placeholder", encoding="utf-8")
+    for name in ("naked", "scaffold"):
+        (tmp_path / f"solution_{name}.py").write_text(name, encoding="utf-8")
+    artifacts = tmp_path / "artifacts"
+
+    def fake_runner(cmd, cwd):
+        installed = (cwd / "solution.py").read_text(encoding="utf-8")
+        return CompletedProcess(cmd, 0, stdout=f"{installed} output\n1 passed in 0.01s", stderr="")
+
+    runner = ExperimentRunner(tmp_path, tests_file, artifacts, runner=fake_runner, benchmark=False, cache=False)
+    conditions = [ConditionSpec(name, tmp_path / f"solution_{name}.py") for name in ("naked", "scaffold")]
+    summary = runner.run(conditions, model_name="m", trials=3)
+
+    log = summary["conditions"]
+    assert isinstance(log, ResultsLog) and len(log) == 6
+    assert log[4]["trial_id"] == "scaffold-0001" and log[4]["stdout"].startswith("scaffold output")
+    assert [c["condition"] for c in log[:2]] == ["naked", "naked"]
+
+    (artifacts / "automated_results.md").unlink()
+    with (artifacts / "automated_results.jsonl").open("a", encoding="utf-8") as handle:
+        handle.write('{"condition": "naked", "trial_id": "torn')  # interrupted mid-write
+    rebuilt = write_reports(artifacts)
+    assert rebuilt["model_name"] == "m" and rebuilt["statistics"]["scaffold"]["trials"] == 3
+    assert "## scaffold (scaffold-0002)" in (artifacts / "automated_results.md").read_text(encoding="utf-8")
+    report = json.loads((artifacts / "automated_results.json").read_text(encoding="utf-8"))
+    assert len(report["conditions"]) == 6 and report["statistics"]["naked"]["all_passed"] == 1.0
+
+
+def test_results_store_aggregates_across_runs(tmp_path):
+    tests_file = tmp_path / "test_stream_utf8_normalizer.py"
+    tests_file.write_text("# placeholder", encoding="utf-8")
+    for name in ("naked", "scaffold"):
+        (tmp_path / f"solution_{name}.py").write_text(name, encoding="utf-8")
+    bench = {"peak_rss_bytes": 1 << 20, "results": [{"bytes": 2_000_000, "seconds": 1.0, "push_p50_ns": 1,
+                                                      "push_p99_ns": 5, "error": ""}]}
+
+    def fake_runner(cmd, cwd):
+        if "benchmark" in cmd:
+            return CompletedProcess(cmd, 0, stdout=json.dumps(bench), stderr="")
+        installed = (cwd / "solution.py").read_text(encoding="utf-8")
+        return CompletedProcess(cmd, 0, stdout="11 passed" if installed == "scaffold" else "8 passed, 3 failed")
+
+    conditions = [ConditionSpec(name, tmp_path / f"solution_{name}.py") for name in ("naked", "scaffold")]
+    for model in ("model-a", "model-b"):
+        runner = ExperimentRunner(tmp_path, tests_file, tmp_path / "artifacts", runner=fake_runner, cache=False)
+        runner.run(conditions, model_name=model, trials=2)
+
+    with ResultsStore(tmp_path / "artifacts" / "results.sqlite") as store:
+        rows = store.pass_rates()
+        assert [(r["model_name"], r["condition"], r["trials"], r["all_passed"]) for r in rows] == [
+            ("model-a", "naked", 2, 0), ("model-a", "scaffold", 2, 1),
+            ("model-b", "naked", 2, 0), ("model-b", "scaffold", 2, 1),
+        ]
+        assert store.pass_rates(group_by=["condition"], model_name="model-b")[0]["pass_rate"] == 8 / 11
+        assert len({r["solution_sha256"] for r in store.pass_rates(group_by=["solution_sha256"])}) == 2
+        trend = store.throughput_trend(condition="scaffold")
+        assert [(r["trials"], r["mb_per_s"], r["push_p99_ns"]) for r in trend] == [(2, 2.0, 5), (2, 2.0, 5)]
+        assert store.pass_rates(since=time.time() + 60) == []
+
+
+def test_experiment_runner_reads_junit_cases(tmp_path):
+    tests_file = tmp_path / "test_stream_utf8_normalizer.py"
+    tests_file.write_text("# placeholder", encoding="utf-8")
+    (tmp_path / "solution_naked.py").write_text("naked", encoding="utf-8")
+    report = (
+        '<testsuites><testsuite name="pytest" tests="3">'
+        '<testcase classname="tests.t" name="test_ascii_split" time="0.002"/>'
+        '<testcase classname="tests.t" name="test_overlong_rejected" time="0.250">'
+        '<failure message="AssertionError: assert out == \'x\'">traceback</failure></testcase>'
+        '<testcase classname="tests.t" name="test_skipped" time="0"><skipped message="later"/></testcase>'
+        "</testsuite></testsuites>"
+    )
+
+    def fake_runner(cmd, cwd):
+        junit = next(part.split("=", 1)[1] for part in cmd if part.startswith("--junitxml="))
+        Path(junit).write_text(report, encoding="utf-8")
+        return CompletedProcess(cmd, 1, stdout="99 passed, 7 failed in 0.3s", stderr="")
+
+    runner = ExperimentRunner(tmp_path, tests_file, tmp_path / "artifacts", runner=fake_runner, benchmark=False)
+    condition = runner.run([ConditionSpec("naked", tmp_path / "solution_naked.py")])["conditions"][0]
+
+    assert condition["tests"] == {"passed": 1, "failed": 1, "errors": 0}
+    assert condition["cases"][1] == {
+        "name": "test_overlong_rejected",
+        "outcome": "failed",
+        "duration": 0.25,
+        "message": "AssertionError: assert out == 'x'",
+    }
+    assert condition["cases"][2]["outcome"] == "skipped"
+    markdown = (tmp_path / "artifacts" / "automated_results.md").read_text(encoding="utf-8")
+    assert "- test_overlong_rejected: AssertionError: assert out == 'x'" in markdown
+    assert "- test_overlong_rejected: 250.0 ms" in markdown
+
+
+def test_results_store_skips_cached_reruns(tmp_path):
+    tests_file = tmp_path / "test_stream_utf8_normalizer.py"
+    tests_file.write_text("# placeholder", encoding="utf-8")
+    for name in ("naked", "scaffold"):
+        (tmp_path / f"solution_{name}.py").write_text(name, encoding="utf-8")
+    bench = {"peak_rss_bytes": 1 << 20, "results": [{"bytes": 2_000_000, "seconds": 1.0, "push_p50_ns": 1,
+                                                      "push_p99_ns": 5, "error": ""}]}
+
+    def fake_runner(cmd, cwd):
+        if "benchmark" in cmd:
+            return CompletedProcess(cmd, 0, stdout=json.dumps(bench), stderr="")
+        return CompletedProcess(cmd, 0, stdout="11 passed")
+
+    conditions = [ConditionSpec(name, tmp_path / f"solution_{name}.py") for name in ("naked", "scaffold")]
+    for _ in range(2):
+        ExperimentRunner(tmp_path, tests_file, tmp_path / "artifacts", runner=fake_runner).run(conditions, trials=2)
+
+    with ResultsStore(tmp_path / "artifacts" / "results.sqlite") as store:
+        cached = store.connection.execute("SELECT cached, COUNT(*) FROM trials GROUP BY cached").fetchall()
+        assert [tuple(row) for row in cached] == [(0, 4), (1, 4)]
+        assert [(r["condition"], r["trials"]) for r in store.pass_rates()] == [("naked", 2), ("scaffold", 2)]
+        assert [r["trials"] for r in store.pass_rates(group_by=["solution_sha256"])] == [2, 2]
+        assert [(r["condition"], r["trials"]) for r in store.throughput_trend()] == [("naked", 2), ("scaffold", 2)]
+
+
+def test_experiment_runner_records_performance(tmp_path):
+    tests_file = tmp_path / "test_stream_utf8_normalizer.py"
+    tests_file.write_text("# placeholder", encoding="utf-8")
+    (tmp_path / "solution_fast.py").write_text("fast", encoding="utf-8")
+    (tmp_path / "solution_broken.py").write_text("broken", encoding="utf-8")
+    report = {
+        "peak_rss_bytes": 1 << 20,
+        "results": [
+            {"bytes": 3_000_000, "seconds": 1.0, "push_p50_ns": 100, "push_p99_ns": 900, "error": ""},
+            {"bytes": 1_000_000, "seconds": 1.0, "push_p50_ns": 300, "push_p99_ns": 700, "error": ""},
+        ],
+    }
+
+    def fake_runner(cmd, cwd):
+        if "benchmark" not in cmd:
+            return CompletedProcess(cmd, 0, stdout="1 passed in 0.01s", stderr="")
+        if any(part.endswith("solution_broken.py") for part in cmd):
+            return CompletedProcess(cmd, 1, stdout="", stderr="Traceback ...\nSyntaxError: bad")
+        return CompletedProcess(cmd, 0, stdout=json.dumps(report), stderr="")
+
+    runner = ExperimentRunner(tmp_path, tests_file, tmp_path / "artifacts", runner=fake_runner)
+    summary = runner.run(
+        [ConditionSpec("fast", tmp_path / "solution_fast.py"), ConditionSpec("broken", tmp_path / "solution_broken.py")]
+    )
+
+    fast, broken = (condition["performance"] for condition in summary["conditions"])
+    assert fast == {
+        "mb_per_s": 2.0, "push_p50_ns": 200, "push_p99_ns": 900, "peak_rss_bytes": 1 << 20, "error": ""
+    }
+    assert broken == {"error": "SyntaxError: bad"}
+    rows = (tmp_path / "artifacts" / "automated_scorecard.csv").read_text(encoding="utf-8").splitlines()
+    assert rows[0].split(",")[7:11] == ["mb_per_s", "push_p50_ns", "push_p99_ns", "peak_rss_bytes"]
+    assert rows[1].split(",")[7:11] == ["2.00", "200", "900", "1048576"]
+    assert rows[2].split(",")[7:11] == ["", "", "", ""]
+    assert "throughput: 2.00 MB/s" in (tmp_path / "artifacts" / "automated_results.md").read_text(encoding="utf-8")
+
+
+def test_in_process_runner_isolates_hangs_and_crashes(tmp_path):
+    solution = tmp_path / "candidate.py"
+    solution.write_text("VALUE = 42\n", encoding="utf-8")
+    tests_file = tmp_path / "test_candidate.py"
+    tests_file.write_text(
+        "import os, time\n"
+        "import solution\n"
+        "def test_value():\n    assert solution.VALUE == 42\n"
+        "def test_wrong():\n    assert solution.VALUE == 0\n"
+        "def test_hangs():\n    time.sleep(30)\n"
+        "def test_crashes():\n    os._exit(3)\n"
+        "def test_after_crash():\n    print('noise')\n",
+        encoding="utf-8",
+    )
+
+    result = run_tests_in_process(solution, tests_file, timeout=1.0)
+
+    assert [(case.name, case.outcome) for case in result.cases] == [
+        ("test_value", "passed"),
+        ("test_wrong", "failed"),
+        ("test_hangs", "failed"),
+        ("test_crashes", "failed"),
+        ("test_after_crash", "passed"),
+    ]
+    assert result.cases[2].message == "timed out after 1s"
+    assert result.cases[3].message == "worker crashed with exit code 3"
+    assert result.tests == {"passed": 2, "failed": 3, "errors": 0} and result.returncode == 1
+    assert result.summary.startswith("3 failed, 2 passed in ")
+    assert "FAILED test_candidate.py::test_wrong - AssertionError: assert solution.VALUE == 0" in result.stdout
+    assert not any(name.startswith("nepsis_candidate_candidate_") for name in sys.modules)
+
+
+def test_trial_statistics_and_candidate_discovery(tmp_path):
+    stats = describe([0.0, 1.0, 1.0, 1.0])
+    assert stats["n"] == 4 and stats["mean"] == 0.75 and stats["p50"] == 1.0
+    assert stats["p95"] == 1.0 and 0.0 <= stats["ci_low"] <= 0.75 <= stats["ci_high"] <= 1.0
+    assert describe([2.0])["ci_low"] == describe([2.0])["ci_high"] == 2.0
+
+    summary = summarize_trials(
+        [
+            {"condition": "naked", "tests": {"passed": 8, "failed": 3, "errors": 0}, "seconds": 0.2},
+            {"condition": "naked", "tests": {"passed": 11, "failed": 0, "errors": 0}, "seconds": 0.4},
+        ]
+    )
+    assert summary["naked"]["all_passed"] == 0.5
+    assert round(summary["naked"]["runtime_seconds"]["mean"], 6) == 0.3
+
+    for relative in ("naked/gen_a.py", "naked/gen_b.py", "scaffold/gen_a.py", "baseline.py"):
+        (tmp_path / "candidates" / relative).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / "candidates" / relative).write_text("", encoding="utf-8")
+    (tmp_path / "prompts").mkdir()
+    (tmp_path / "prompts" / "naked.txt").write_text("prompt", encoding="utf-8")
+    found = discover_candidates(tmp_path / "candidates", tmp_path / "prompts")
+    assert [(c.name, c.solution_path.name, c.prompt_path is not None) for c in found] == [
+        ("baseline", "baseline.py", False),
+        ("naked", "gen_a.py", True),
+        ("naked", "gen_b.py", True),
+        ("scaffold", "gen_a.py", False),
+    ]
+
+
+def test_normalize_stream_small_blocks():
+    normalizer_cls = load_normalizer(SCAFFOLD_SOLUTION)
+    source = io.BytesIO("Cafe\u0301 \u1112\u1161 ok\n".encode("utf-8") + b"\xff tail")
+    sink = io.BytesIO()
+    errors = io.StringIO()
+    stats = normalize_stream(source, sink, normalizer_cls, block_size=3, errors_sink=errors)
+    assert sink.getvalue().decode("utf-8") == "Café 하 ok\n\ufffd tail"
+    assert [json.loads(line) for line in errors.getvalue().splitlines()] == [
+        {"start": 17, "end": 18, "kind": 5}
+    ]
+    assert stats.bytes_in == 23 and stats.errors == 1
+
+
+def test_normalize_file_mmap_matches_stream(tmp_path):
+    normalizer_cls = load_normalizer(SCAFFOLD_SOLUTION)
+    payload = "A\u0301 \u1112\u1161\u11ab x".encode("utf-8") * 50 + b"\x80" * 13 + b"\xed\xa0\x80 end \xe2\x82"
+    source = tmp_path / "input.txt"
+    source.write_bytes(payload)
+
+    streamed = io.BytesIO()
+    stream_errors = io.StringIO()
+    normalize_stream(io.BytesIO(payload), streamed, normalizer_cls, block_size=7, errors_sink=stream_errors)
+
+    mapped_errors = io.StringIO()
+    stats = normalize_file_mmap(
+        source, tmp_path / "output.txt", normalizer_cls, window=5, errors_sink=mapped_errors
+    )
+    assert (tmp_path / "output.txt").read_bytes() == streamed.getvalue()
+    assert mapped_errors.getvalue() == stream_errors.getvalue()
+    assert stats.bytes_out == len(streamed.getvalue()) and stats.errors == 3
+
+
+def test_normalize_parallel_matches_serial(tmp_path):
+    normalizer_cls = load_normalizer(SCAFFOLD_SOLUTION)
+    # Jamo L/V pairs, split sequences and truncations near every possible cut
+    unit = "\u1112\u1161\u11ab e\u0301 \u65e5".encode("utf-8") + b"\xf0\x9fa\xc0\xaf"
+    payload = unit * 40 + b"\xe2\x82"
+    source = tmp_path / "input.txt"
+    source.write_bytes(payload)
+
+    serial = io.BytesIO()
+    serial_errors = io.StringIO()
+    normalize_stream(io.BytesIO(payload), serial, normalizer_cls, errors_sink=serial_errors)
+
+    parallel_errors = io.StringIO()
+    stats = normalize_parallel(
+        source,
+        tmp_path / "output.txt",
+        SCAFFOLD_SOLUTION,
+        workers=2,
+        shard_size=37,
+        errors_sink=parallel_errors,
+    )
+    assert (tmp_path / "output.txt").read_bytes() == serial.getvalue()
+    assert parallel_errors.getvalue() == serial_errors.getvalue()
+    assert stats.errors == 40 * 3 + 1
+
+
+def test_normalize_paths_agree_on_corruption_across_blocks(tmp_path):
+    # Stray continuation runs and a split sequence straddle every 64 KiB block
+    # boundary of normalize_stream, and the shard boundaries in between.
+    block = 1 << 16
+    text = "\u1112\u1161\u11ab e\u0301 \u65e5 ".encode("utf-8") * (block // 15 + 1)
+    payload = bytearray(text[:3 * block + 100])
+    for boundary in (block, 2 * block):
+        payload[boundary - 5:boundary + 7] = b"\x80" * 12
+    payload[3 * block - 1:3 * block + 1] = b"\xc3\xa9"
+    source = tmp_path / "input.txt"
+    source.write_bytes(payload)
+    normalizer_cls = load_normalizer(SCAFFOLD_SOLUTION)
+
+    serial = io.BytesIO()
+    serial_errors = io.StringIO()
+    normalize_stream(io.BytesIO(bytes(payload)), serial, normalizer_cls, errors_sink=serial_errors)
+    whole = normalizer_cls()
+    assert serial.getvalue().decode("utf-8") == whole.push(bytes(payload)) + whole.finish()
+    assert [(r["start"], r["end"]) for r in map(json.loads, serial_errors.getvalue().splitlines())] == list(
+        whole.errors
+    )
+
+    mapped_errors = io.StringIO()
+    normalize_file_mmap(source, tmp_path / "mapped.txt", normalizer_cls, errors_sink=mapped_errors)
+    parallel_errors = io.StringIO()
+    normalize_parallel(source, tmp_path / "parallel.txt", SCAFFOLD_SOLUTION, workers=2, shard_size=50_000,
+                       errors_sink=parallel_errors)
+    for name, errors in (("mapped.txt", mapped_errors), ("parallel.txt", parallel_errors)):
+        assert (tmp_path / name).read_bytes() == serial.getvalue()
+        assert errors.getvalue() == serial_errors.getvalue()
+
+
+def test_async_stream_normalizer_offloads_large_chunks():
+    normalizer_cls = load_normalizer(SCAFFOLD_SOLUTION)
+
+    async def collect():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"e\xcc")
+        reader.feed_data(b"\x81 " + b"x" * 64 + b" \xff")
+        reader.feed_data(b"\xe2\x82")
+        reader.feed_eof()
+        adapter = AsyncStreamNormalizer(reader, normalizer_cls(), block_size=16, offload_threshold=8)
+        pieces = [piece async for piece in adapter]
+        return pieces, adapter.errors
+
+    pieces, errors = asyncio.run(collect())
+    assert "".join(pieces) == "\u00e9 " + "x" * 64 + " \ufffd\ufffd"
+    assert len(pieces) > 1
+    assert errors == [(69, 70), (70, 72)]
+
+
+def test_benchmark_report_shape(tmp_path):
+    assert build_corpus("cjk", 1000) == build_corpus("cjk", 1000)
+    assert build_corpus("jamo", 1000).decode("utf-8")
+    broken = tmp_path / "broken.py"
+    broken.write_text("raise ImportError('nope')\n", encoding="utf-8")
+
+    report = run_benchmarks(
+        [SCAFFOLD_SOLUTION, broken], corpora=["ascii", "corrupt-1"], chunk_sizes=[7, 4096], size=4096, repeat=1
+    )
+    results = report["results"]
+    assert len(results) == 8 and json.loads(json.dumps(report)) == report
+    measured = [r for r in results if r["solution"] == str(SCAFFOLD_SOLUTION)]
+    assert all(not r["error"] and r["mb_per_s"] > 0 and r["peak_bytes"] > 0 for r in measured)
+    assert {(r["chunk_size"], r["pushes"]) for r in measured} == {(7, 586), (4096, 1)}
+    assert all(r["error"].startswith("ImportError") for r in results if r["solution"] == str(broken))
@@ -1,210 +1,809 @@
+import codecs
+import io
+import os
+import re
+import struct
+import threading
 import unicodedata
+from array import array
+
+# Noncharacters are well-formed UTF-8, so the C codec accepts them. In valid
+# UTF-8 these byte patterns can only start at a lead byte, so every match is
+# exactly one noncharacter: U+FDD0..U+FDEF, U+FFFE/U+FFFF, U+nFFFE/U+nFFFF.
+_NONCHARACTER_BYTES = re.compile(
+    rb"\xEF\xB7[\x90-\xAF]|\xEF\xBF[\xBE\xBF]|[\xF0-\xF4][\x8F\x9F\xAF\xBF]\xBF[\xBE\xBF]"
+)
+# Literal-prefix patterns are scanned by sre an order of magnitude faster than
+# the alternation above; one of them must hit before the full scan is worth it.
+_NONCHARACTER_HINTS = (re.compile(rb"\xEF\xB7[\x90-\xAF]"), re.compile(rb"\xBF[\xBE\xBF]"))
+
+# Smallest C decode window after a malformed byte (see push()).
+_MIN_WINDOW = 64
+# Pushes of at most this many bytes skip the C codec: its per-call setup
+# (memoryview cast, error-handler state, noncharacter scan) costs more than
+# running the state machine over a few bytes.
+_SHORT_CHUNK = 8
+
+_stop = threading.local()
+
+# ---------------- Code point property table ----------------
+#
+# One byte of flags per code point, stored as a two-stage trie: STAGE1 maps the
+# high bits (cp >> 8) to the start of a deduplicated 256-entry block in STAGE2,
+# so a lookup is  STAGE2[STAGE1[cp >> 8] + (cp & 0xFF)].  Built lazily on first
+# use and optionally cached on disk (set UTF8_NORMALIZER_CACHE_DIR); the cache
+# file is keyed on unicodedata.unidata_version.
+
+STARTER = 0x01       # canonical combining class 0
+BOUNDARY = 0x02      # stable NFC boundary before this char (safe flush point)
+NONCHARACTER = 0x04  # U+FDD0..U+FDEF, U+nFFFE, U+nFFFF
+JAMO_L = 0x08        # Hangul leading consonant (modern + extended-A)
+JAMO_V = 0x10        # Hangul vowel (modern + extended-B)
+
+_TABLE_FORMAT = 1
+_BLOCK = 256
+_tables = None
+
+
+def _composes_backward():
+    """Chars with NFC_Quick_Check=Maybe: they can compose with the char before them."""
+    chars = set()
+    for cp in range(0x30000):  # canonical decompositions all live below U+30000
+        decomposition = unicodedata.decomposition(chr(cp))
+        if not decomposition or decomposition.startswith("<"):
+            continue
+        parts = decomposition.split()
+        # second half of a primary composite (excluded composites do not recompose)
+        if len(parts) == 2 and unicodedata.normalize("NFC", chr(cp)) == chr(cp):
+            chars.add(int(parts[1], 16))
+    # Hangul V / T jamo compose algorithmically with a preceding L / LV
+    chars.update(range(0x1161, 0x1176))
+    chars.update(range(0x11A8, 0x11C3))
+    return chars
+
+
+def _block_flags(base: int, maybe: set) -> bytes:
+    chars = "".join(map(chr, range(base, base + _BLOCK)))
+    # One C-level NFD pass tells whether any char in the block decomposes.
+    decomposes = unicodedata.normalize("NFD", chars) != chars
+    combining = unicodedata.combining
+    flags = bytearray(_BLOCK)
+    for i, ch in enumerate(chars):
+        cp = base + i
+        value = 0 if combining(ch) else STARTER
+        # A boundary sits before ch if NFC(text + ch + rest) == NFC(text) + NFC(ch + rest)
+        # for any text: the decomposition of ch starts with a starter that cannot
+        # compose backward.
+        first = unicodedata.normalize("NFD", ch)[0] if decomposes else ch
+        if not combining(first) and ord(first) not in maybe:
+            value |= BOUNDARY
+        if 0xFDD0 <= cp <= 0xFDEF or (cp & 0xFFFE) == 0xFFFE:
+            value |= NONCHARACTER
+        if 0x1100 <= cp <= 0x115F or 0xA960 <= cp <= 0xA97F:
+            value |= JAMO_L
+        if 0x1160 <= cp <= 0x11A7 or 0xD7B0 <= cp <= 0xD7C6:
+            value |= JAMO_V
+        flags[i] = value
+    return bytes(flags)
+
+
+def _build_tables():
+    maybe = _composes_backward()
+    stage1 = array("I")
+    stage2 = bytearray()
+    blocks = {}
+    for base in range(0, 0x110000, _BLOCK):
+        block = _block_flags(base, maybe)
+        offset = blocks.get(block)
+        if offset is None:
+            offset = blocks[block] = len(stage2)
+            stage2 += block
+        stage1.append(offset)
+    return stage1, bytes(stage2)
+
+
+def _table_cache_path():
+    cache_dir = os.environ.get("UTF8_NORMALIZER_CACHE_DIR")
+    if not cache_dir:
+        return None
+    name = f"utf8-normalizer-props-v{_TABLE_FORMAT}-unicode-{unicodedata.unidata_version}.bin"
+    return os.path.join(cache_dir, name)
+
+
+def _load_tables():
+    """Return (STAGE1, STAGE2), building or loading them on first use."""
+    global _tables
+    if _tables is not None:
+        return _tables
+    path = _table_cache_path()
+    if path and os.path.exists(path):
+        with open(path, "rb") as handle:
+            stage1 = array("I")
+            stage1.frombytes(handle.read(4 * (0x110000 // _BLOCK)))
+            stage2 = handle.read()
+        _tables = stage1, stage2
+        return _tables
+    _tables = _build_tables()
+    if path:
+        # Best effort: write to a temp file first so readers never see half a table.
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as handle:
+                handle.write(_tables[0].tobytes())
+                handle.write(_tables[1])
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    return _tables
+
+
+def code_point_flags(cp: int) -> int:
+    """Flag byte (STARTER | BOUNDARY | ...) for a code point."""
+    stage1, stage2 = _load_tables()
+    return stage2[stage1[cp >> 8] + (cp & 0xFF)]
+
+
+def _stop_at_error(exc):
+    # Custom codec error handler: remember where the valid prefix ends and
+    # abandon the rest of the input instead of substituting anything.
+    _stop.start = exc.start
+    return "", len(exc.object)
+
+
+# Error handlers are registered process-wide; a per-module name keeps two
+# loaded copies of this file from sharing (and misreading) one _stop.
+_STOP_HANDLER = f"utf8-stream-stop-{id(_stop):x}"
+codecs.register_error(_STOP_HANDLER, _stop_at_error)
+
+
+def _decode_valid(view):
+    """
+    Decode the maximal valid UTF-8 prefix of view with the C codec
+    (codecs.utf_8_decode is the routine getincrementaldecoder('utf-8') wraps).
+    Returns (text, bytes_consumed, stopped_at_malformed_byte). With final=False
+    an incomplete trailing sequence is left unconsumed without an error.
+    """
+    _stop.start = -1
+    text, consumed = codecs.utf_8_decode(view, _STOP_HANDLER, False)
+    if _stop.start < 0:
+        return text, consumed, False
+    return text, _stop.start, True
+
+
+# ---------------- Error store ----------------
+
+# Error kinds, indexes into ERROR_KINDS.
+ERR_OVERLONG = 0            # code point encoded with more bytes than needed
+ERR_SURROGATE = 1           # U+D800..U+DFFF
+ERR_NONCHARACTER = 2        # well-formed, but a noncharacter
+ERR_TRUNCATED = 3           # lead byte not followed by enough continuation bytes
+ERR_STRAY_CONTINUATION = 4  # run of continuation bytes without a lead byte
+ERR_INVALID_LEAD = 5        # 0xF5..0xFF
+ERR_OUT_OF_RANGE = 6        # above U+10FFFF
+ERROR_KINDS = (
+    "overlong", "surrogate", "noncharacter", "truncated",
+    "stray_continuation", "invalid_lead", "out_of_range",
+)
+
+KEEP_ALL = "all"      # store every span
+KEEP_FIRST = "first"  # store the first max_errors spans, only count the rest
+COUNT_ONLY = "count"  # store no spans, only the total and per-kind histogram
+
+
+class ErrorSpans:
+    """
+    Error spans stored as array columns: start and end as array('Q'), and the
+    ERR_* kind code of each span as array('B') (17 bytes per span instead of a
+    ~100 byte tuple in a list). Reads like a list of (start, end) tuples, so
+    `errors == [(0, 2)]`, iteration, indexing and `del errors[:]` still work.
+    total, counts (indexed by kind code) and histogram() cover every error
+    seen, stored or not.
+    With merge_adjacent, a span starting where the previous one ended extends
+    it instead of adding a new one (one span per corrupt run, with the kind of
+    its first error).
+    """
+
+    __slots__ = ("policy", "max_errors", "merge_adjacent", "starts", "ends", "kinds", "total", "counts")
+
+    def __init__(self, policy: str = KEEP_ALL, max_errors: int = 0, merge_adjacent: bool = False):
+        if policy not in (KEEP_ALL, KEEP_FIRST, COUNT_ONLY):
+            raise ValueError(f"unknown error policy: {policy!r}")
+        if policy == KEEP_FIRST and max_errors <= 0:
+            raise ValueError("error policy 'first' needs max_errors > 0")
+        self.policy = policy
+        self.max_errors = max_errors
+        self.merge_adjacent = merge_adjacent
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self.kinds = array("B")
+        self.total = 0
+        self.counts = array("Q", bytes(8 * len(ERROR_KINDS)))
+
+    def add(self, start: int, end: int, kind: int) -> None:
+        self.total += 1
+        self.counts[kind] += 1
+        if self.policy == COUNT_ONLY:
+            return
+        ends = self.ends
+        if self.merge_adjacent and ends and ends[-1] == start:
+            ends[-1] = end
+            return
+        if self.policy == KEEP_FIRST and len(ends) >= self.max_errors:
+            return
+        self.starts.append(start)
+        ends.append(end)
+        self.kinds.append(kind)
+
+    def records(self):
+        """Iterate over stored spans as (start, end, kind) triples."""
+        return zip(self.starts, self.ends, self.kinds)
+
+    def histogram(self) -> dict:
+        """{kind name: count} for every kind seen at least once."""
+        return {name: count for name, count in zip(ERROR_KINDS, self.counts) if count}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self.starts[index], self.ends[index]))
+        return self.starts[index], self.ends[index]
+
+    def __delitem__(self, index) -> None:
+        del self.starts[index]
+        del self.ends[index]
+        del self.kinds[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (ErrorSpans, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+# snapshot() layout, little-endian: version, byte_offset, pending length,
+# pending (zero padded), errors seen, segment length, start of the open stray
+# continuation run (-1 if none); then the per-kind error counters, then the
+# segment as UTF-8.
+_SNAPSHOT_VERSION = 2
+_SNAPSHOT = struct.Struct("<BQB3sQIq")
+_SNAPSHOT_COUNTS = struct.Struct(f"<{len(ERROR_KINDS)}Q")
+
+
+class _TextSink:
+    """Adapts a write(str) callable to the out_parts.append protocol."""
+
+    __slots__ = ("append",)
+
+    def __init__(self, write):
+        self.append = write
+
+
+class _Utf8Sink:
+    """Writes UTF-8 bytes; raw input bytes that are already NFC go through as-is."""
+
+    __slots__ = ("write",)
+
+    def __init__(self, write):
+        self.write = write
+
+    def append(self, text: str):
+        self.write(text.encode("utf-8"))
+
+    def append_raw(self, data):
+        self.write(data)
+
+
+def _sink_for(sink):
+    if isinstance(sink, bytearray):
+        return _Utf8Sink(sink.extend)
+    if isinstance(sink, (io.RawIOBase, io.BufferedIOBase)):
+        return _Utf8Sink(sink.write)
+    return _TextSink(sink.write)
+
 
 class Utf8StreamNormalizer:
     """
     Streaming UTF-8 validator + NFC normalizer with:
       - RFC 3629 checks (no overlongs, surrogates, >U+10FFFF, noncharacters)
       - Byte-accurate error spans
-      - Cross-chunk NFC with a safe flush policy that understands Hangul Jamo
+      - Cross-chunk NFC that only flushes text before a stable boundary
     """
 
-    def __init__(self):
-        self.buffer = bytearray()
-        self.byte_offset = 0
-        self.errors = []
-        self.segment = []  # current canonical segment (list[str])
+    def __init__(self, error_policy: str = KEEP_ALL, max_errors: int = 0, merge_adjacent: bool = False):
+        """
+        error_policy/max_errors/merge_adjacent configure the ErrorSpans store
+        that backs self.errors (see ErrorSpans).
+        """
+        ErrorSpans(error_policy, max_errors, merge_adjacent)  # validate early
+        self._error_policy = (error_policy, max_errors, merge_adjacent)
+        self.reset()
 
     # ---------------- Public API ----------------
 
     def push(self, chunk: bytes) -> str:
         if not chunk:
             return ""
-        self.buffer.extend(chunk)
         out = []
-        pos = 0
-        n = len(self.buffer)
+        if isinstance(chunk, bytes) and len(chunk) <= _SHORT_CHUNK:
+            self._feed_short(chunk, out)  # skips a call per push; _feed would dispatch the same way
+        else:
+            self._feed(chunk, out)
+        return "".join(out)
 
-        while pos < n:
-            b0 = self.buffer[pos]
-
-            # ASCII fast path
-            if b0 <= 0x7F:
-                self._accept_char(chr(b0), out)
-                pos += 1
-                continue
-
-            # Lone continuation bytes run (treat as one invalid run)
-            if 0x80 <= b0 <= 0xBF:
-                run_start = pos
-                pos += 1
-                while pos < n and 0x80 <= self.buffer[pos] <= 0xBF:
-                    pos += 1
-                self._record_span_error(run_start, pos)
-                self._accept_char("\uFFFD", out)
-                continue
+    def finish(self) -> str:
+        out = []
+        self._finish(out)
+        return "".join(out)
 
-            # ----- Multi-byte sequences -----
+    def push_into(self, chunk: bytes, sink) -> None:
+        """
+        Like push(), but write the normalized output straight into sink instead
+        of joining a new str. sink may be:
+          - a bytearray or binary stream → UTF-8 bytes; input bytes that are
+            already valid NFC are copied through without a decode/encode trip
+          - anything else with write(str), e.g. io.StringIO or a text file
+        """
+        if chunk:
+            self._feed(chunk, _sink_for(sink))
 
-            # 2-byte: 110xxxxx 10xxxxxx
-            if 0xC0 <= b0 <= 0xDF:
-                if pos + 1 >= n:
-                    break  # incomplete
-                b1 = self.buffer[pos + 1]
-                if not (0x80 <= b1 <= 0xBF):
-                    # invalid follower → consume 1 byte only (minimal advance)
-                    self._record_span_error(pos, pos + 1)
-                    self._accept_char("\uFFFD", out)
-                    pos += 1
-                    continue
-                cp = ((b0 & 0x1F) << 6) | (b1 & 0x3F)
-                # overlong: cp < 0x80
-                if cp < 0x80 or self._is_noncharacter(cp):
-                    self._record_span_error(pos, pos + 2)
-                    self._accept_char("\uFFFD", out)
-                else:
-                    self._accept_char(chr(cp), out)
-                pos += 2
-                continue
-
-            # 3-byte: 1110xxxx 10xxxxxx 10xxxxxx
-            if 0xE0 <= b0 <= 0xEF:
-                if pos + 2 >= n:
-                    break  # incomplete
-                b1, b2 = self.buffer[pos + 1], self.buffer[pos + 2]
-                if not (0x80 <= b1 <= 0xBF and 0x80 <= b2 <= 0xBF):
-                    # minimal advance on bad follower
-                    self._record_span_error(pos, pos + 1)
-                    self._accept_char("\uFFFD", out)
-                    pos += 1
-                    continue
-                # Lead-byte boundary checks to avoid overlongs/surrogates
-                if b0 == 0xE0 and b1 < 0xA0:  # overlong
-                    self._record_span_error(pos, pos + 3)
-                    self._accept_char("\uFFFD", out)
-                    pos += 3
-                    continue
-                if b0 == 0xED and b1 >= 0xA0:  # surrogates
-                    self._record_span_error(pos, pos + 3)
-                    self._accept_char("\uFFFD", out)
-                    pos += 3
-                    continue
-                cp = ((b0 & 0x0F) << 12) | ((b1 & 0x3F) << 6) | (b2 & 0x3F)
-                if cp < 0x800 or (0xD800 <= cp <= 0xDFFF) or self._is_noncharacter(cp):
-                    self._record_span_error(pos, pos + 3)
-                    self._accept_char("\uFFFD", out)
-                else:
-                    self._accept_char(chr(cp), out)
-                pos += 3
-                continue
-
-            # 4-byte: 11110xxx 10xxxxxx 10xxxxxx 10xxxxxx
-            if 0xF0 <= b0 <= 0xF4:
-                if pos + 3 >= n:
-                    break  # incomplete
-                b1, b2, b3 = self.buffer[pos + 1], self.buffer[pos + 2], self.buffer[pos + 3]
-                if not (0x80 <= b1 <= 0xBF and 0x80 <= b2 <= 0xBF and 0x80 <= b3 <= 0xBF):
-                    self._record_span_error(pos, pos + 1)
-                    self._accept_char("\uFFFD", out)
-                    pos += 1
-                    continue
-                # Lead-byte boundary checks to avoid overlongs and >U+10FFFF
-                if b0 == 0xF0 and b1 < 0x90:      # overlong for 4-byte
-                    self._record_span_error(pos, pos + 4)
-                    self._accept_char("\uFFFD", out)
-                    pos += 4
-                    continue
-                if b0 == 0xF4 and b1 > 0x8F:      # beyond U+10FFFF
-                    self._record_span_error(pos, pos + 4)
-                    self._accept_char("\uFFFD", out)
-                    pos += 4
-                    continue
-                cp = ((b0 & 0x07) << 18) | ((b1 & 0x3F) << 12) | ((b2 & 0x3F) << 6) | (b3 & 0x3F)
-                if cp < 0x10000 or cp > 0x10FFFF or self._is_noncharacter(cp):
-                    self._record_span_error(pos, pos + 4)
-                    self._accept_char("\uFFFD", out)
-                else:
-                    self._accept_char(chr(cp), out)
-                pos += 4
-                continue
-
-            # 0xF5..0xFF are invalid lead bytes
-            self._record_span_error(pos, pos + 1)
-            self._accept_char("\uFFFD", out)
-            pos += 1
-
-        # Advance global offset and keep any incomplete tail in buffer
-        self.byte_offset += pos
-        if pos:
-            del self.buffer[:pos]
+    def finish_into(self, sink) -> None:
+        """finish() counterpart of push_into()."""
+        self._finish(_sink_for(sink))
 
-        return "".join(out)
+    @property
+    def error_counts(self) -> array:
+        """
+        Errors seen so far per kind, indexed by ERR_* code (see ERROR_KINDS).
+        Kept up to date as errors are recorded and unaffected by the retention
+        policy or by draining self.errors.
+        """
+        return self.errors.counts
 
-    def finish(self) -> str:
-        out = []
+    def snapshot(self) -> bytes:
+        """
+        Serialize the carry-over state: byte_offset, the pending bytes (at most 3),
+        the unstable NFC segment, the open stray run and the error cursor (errors
+        seen so far, total and per kind). Stored spans are not included; drain
+        them before checkpointing.
+        Input resumes at byte_offset + len(pending).
+        """
+        errors = self.errors
+        segment = self.segment.encode("utf-8")
+        return (
+            _SNAPSHOT.pack(_SNAPSHOT_VERSION, self.byte_offset, len(self.pending),
+                           self.pending, errors.total, len(segment), self.open_run)
+            + _SNAPSHOT_COUNTS.pack(*errors.counts)
+            + segment
+        )
+
+    def restore(self, state: bytes) -> None:
+        """Replace the stream state with one produced by snapshot()."""
+        view = memoryview(state)
+        if len(view) < _SNAPSHOT.size + _SNAPSHOT_COUNTS.size or view[0] != _SNAPSHOT_VERSION:
+            raise ValueError("not a Utf8StreamNormalizer snapshot of this version")
+        _, byte_offset, n_pending, pending, total, n_segment, open_run = _SNAPSHOT.unpack_from(view)
+        counts = _SNAPSHOT_COUNTS.unpack_from(view, _SNAPSHOT.size)
+        segment = view[_SNAPSHOT.size + _SNAPSHOT_COUNTS.size:]
+        if n_pending > 3 or len(segment) != n_segment:
+            raise ValueError("corrupt Utf8StreamNormalizer snapshot")
+        self.reset()
+        self.byte_offset = byte_offset
+        self.pending = pending[:n_pending]
+        self.segment = str(segment, "utf-8")
+        self.open_run = open_run
+        self.errors.total = total
+        self.errors.counts = array("Q", counts)
+
+    def reset(self) -> None:
+        """Drop all stream state so the instance can normalize a new stream."""
+        self.pending = b""  # incomplete trailing sequence, at most 3 bytes
+        self.byte_offset = 0  # global offset of pending[0] (== bytes fully consumed)
+        self.errors = ErrorSpans(*self._error_policy)
+        self.segment = ""  # unstable NFC tail: text after the last stable boundary
+        # Global start of a stray continuation run that reached the end of the
+        # last push (-1 if none). Its span is recorded once the run ends, so
+        # spans do not depend on where the input was split.
+        self.open_run = -1
+
+    def _feed(self, chunk, out) -> None:
+        if isinstance(chunk, bytes) and len(chunk) <= _SHORT_CHUNK:
+            self._feed_short(chunk, out)
+            return
+        with memoryview(chunk) as view:
+            view = view.cast("B")
+            if self.open_run >= 0 and not 0x80 <= view[0] <= 0xBF:
+                self._close_run()
+            start = self._resume_pending(view, out) if self.pending else 0
+            if start >= 0:
+                end = self._decode_view(view, start, out)
+                # Keep only the incomplete tail; the chunk itself is never copied.
+                self.byte_offset += end
+                self.pending = bytes(view[end:])
+
+    def _feed_short(self, data: bytes, out) -> None:
+        # pending + data stays tiny, so one copy costs less than _resume_pending.
+        pending = self.pending
+        if pending:
+            lead = pending[0]  # C0..F4: only a lead byte is ever left pending
+            if len(pending) + len(data) < (2 if lead < 0xE0 else 3 if lead < 0xF0 else 4):
+                self.pending = pending + data  # still incomplete, as _decode_sequence would find
+                return
+            data = pending + data
+        elif self.open_run >= 0 and not 0x80 <= data[0] <= 0xBF:
+            self._close_run()
+        if data.isascii():  # never true with pending bytes: they start with a lead byte
+            if len(data) == 1:
+                self._accept_char(chr(data[0]), out)
+            else:
+                self._accept_text(str(data, "ascii"), out, data if isinstance(out, _Utf8Sink) else None)
+            self.byte_offset += len(data)
+            return
+        n = len(data)
+        pos = 0
+        while pos < n:
+            step = self._decode_sequence(data, pos, n, out)
+            if not step:
+                break  # incomplete tail, at most 3 bytes
+            pos += step
+        self.byte_offset += pos
+        self.pending = data[pos:]
+
+    def _finish(self, out) -> None:
+        if self.open_run >= 0:
+            self._close_run()
         # Any leftover bytes mean an incomplete sequence → ONE span + ONE U+FFFD
-        if self.buffer:
+        if self.pending:
             start = self.byte_offset
-            end = self.byte_offset + len(self.buffer)
-            self.errors.append((start, end))
-            self.buffer.clear()
-            self._accept_char("\uFFFD", out)
+            end = self.byte_offset + len(self.pending)
+            self.errors.add(start, end, ERR_TRUNCATED)
+            self.byte_offset = end
+            self.pending = b""
+            self._accept_text("\uFFFD", out)
 
         if self.segment:
-            out.append(unicodedata.normalize("NFC", "".join(self.segment)))
-            self.segment.clear()
-        return "".join(out)
+            out.append(unicodedata.normalize("NFC", self.segment))
+            self.segment = ""
 
     # ---------------- Helpers ----------------
 
-    def _accept_char(self, ch: str, out_parts: list):
+    def _resume_pending(self, view, out: list) -> int:
         """
-        Append a char into the current segment.
-        Flush the existing segment ONLY when it is safe:
-          - new char is a starter (combining class 0)
-          - and the existing segment does not end with Hangul Jamo that can still compose
-        This preserves cross-chunk NFC for cases like L+V(+T) → precomposed Hangul.
-        """
-        if self._is_starter(ch) and self._segment_safe_to_flush():
-            if self.segment:
-                out_parts.append(unicodedata.normalize("NFC", "".join(self.segment)))
-                self.segment.clear()
-            self.segment.append(ch)
-        else:
-            self.segment.append(ch)
+        Resolve the sequence carried over from the previous push using a small
+        head = pending + first bytes of the chunk. Returns the chunk index where
+        bulk decoding resumes, or -1 if the chunk was too short to complete it.
+        """
+        carried = len(self.pending)
+        head = self.pending + bytes(view[:3])
+        pos = 0
+        while pos < carried:
+            if 0x80 <= head[pos] <= 0xBF and len(head) < carried + len(view):
+                # A continuation run may extend arbitrarily far into the chunk
+                # (only on corrupt input); give the state machine all of it.
+                head = self.pending + bytes(view)
+            step = self._decode_sequence(head, pos, len(head), out)
+            if not step:
+                # Still incomplete: everything left fits in at most 3 bytes.
+                self.byte_offset += pos
+                self.pending = head[pos:]
+                return -1
+            pos += step
+        self.byte_offset += carried
+        return pos - carried
 
-    def _segment_safe_to_flush(self) -> bool:
+    def _decode_view(self, view, pos: int, out: list) -> int:
         """
-        Safe to flush if:
-          - segment is empty → False (just accumulate)
-          - last char is NOT a Hangul Jamo L or V (which may combine with following Jamo)
+        Decode view[pos:] (chunk coordinates, view[0] at self.byte_offset).
+        Returns the index where an incomplete trailing sequence starts.
         """
-        if not self.segment:
-            return False
-        last = ord(self.segment[-1])
-        if self._is_hangul_jamo_L(last) or self._is_hangul_jamo_V(last):
-            return False
-        return True
+        n = len(view)
+        window = n
+        while pos < n:
+            # Maximal valid span, decoded in C. Stops before an incomplete
+            # tail (final=False) or at the first malformed byte.
+            limit = min(n, pos + window)
+            text, consumed, malformed = _decode_valid(view[pos:limit])
+            if text:
+                self._accept_span(text, view[pos:pos + consumed], pos, out)
+            pos += consumed
 
-    @staticmethod
-    def _is_starter(ch: str) -> bool:
-        return unicodedata.combining(ch) == 0
+            if malformed:
+                # Python state machine for exactly one malformed sequence,
+                # so spans match the RFC 3629 rules below byte for byte.
+                step = self._decode_sequence(view, pos, n, out)
+                if not step:
+                    break  # incomplete
+                pos += step
+                # Every C-level error copies the remaining input into the
+                # exception object, so shrink the window on corrupt input.
+                window = _MIN_WINDOW
+            elif limit < n:
+                window *= 2
+            else:
+                break  # incomplete tail (or everything consumed)
+        return pos
 
-    @staticmethod
-    def _is_hangul_jamo_L(cp: int) -> bool:
-        # L jamo ranges (modern + extended-A)
-        return (0x1100 <= cp <= 0x115F) or (0xA960 <= cp <= 0xA97F)
+    def _decode_sequence(self, data, pos: int, n: int, out: list) -> int:
+        """
+        Decode ONE sequence starting at data[pos] with the RFC 3629 state machine.
+        Returns the number of bytes consumed, or 0 if the sequence is incomplete.
+        Called where the C codec stopped, i.e. at malformed bytes, and for
+        every sequence of a short push (see _feed_short).
+        """
+        b0 = data[pos]
 
-    @staticmethod
-    def _is_hangul_jamo_V(cp: int) -> bool:
-        # V jamo ranges (modern + extended-B)
-        return (0x1160 <= cp <= 0x11A7) or (0xD7B0 <= cp <= 0xD7C6)
+        if b0 <= 0x7F:
+            self._accept_char(chr(b0), out)
+            return 1
+
+        # Lone continuation bytes run (treat as one invalid run)
+        if 0x80 <= b0 <= 0xBF:
+            end = pos + 1
+            while end < n and 0x80 <= data[end] <= 0xBF:
+                end += 1
+            if self.open_run < 0:
+                self._accept_char("\uFFFD", out)
+                self.open_run = self.byte_offset + pos
+            # else: the run left open by the previous push goes on here
+            if end < n:
+                self._close_run(end)
+            return end - pos
+
+        # ----- Multi-byte sequences -----
+
+        # 2-byte: 110xxxxx 10xxxxxx
+        if 0xC0 <= b0 <= 0xDF:
+            if pos + 1 >= n:
+                return 0  # incomplete
+            b1 = data[pos + 1]
+            if not (0x80 <= b1 <= 0xBF):
+                # invalid follower → consume 1 byte only (minimal advance)
+                self._record_span_error(pos, pos + 1, ERR_TRUNCATED)
+                self._accept_char("\uFFFD", out)
+                return 1
+            cp = ((b0 & 0x1F) << 6) | (b1 & 0x3F)
+            # overlong: cp < 0x80 (no noncharacter is below U+0800)
+            if cp < 0x80:
+                self._record_span_error(pos, pos + 2, ERR_OVERLONG)
+                self._accept_char("\uFFFD", out)
+            else:
+                self._accept_char(chr(cp), out)
+            return 2
+
+        # 3-byte: 1110xxxx 10xxxxxx 10xxxxxx
+        if 0xE0 <= b0 <= 0xEF:
+            if pos + 2 >= n:
+                return 0  # incomplete
+            b1, b2 = data[pos + 1], data[pos + 2]
+            if not (0x80 <= b1 <= 0xBF and 0x80 <= b2 <= 0xBF):
+                # minimal advance on bad follower
+                self._record_span_error(pos, pos + 1, ERR_TRUNCATED)
+                self._accept_char("\uFFFD", out)
+                return 1
+            # Lead-byte boundary checks to avoid overlongs/surrogates
+            if b0 == 0xE0 and b1 < 0xA0:  # overlong
+                self._record_span_error(pos, pos + 3, ERR_OVERLONG)
+                self._accept_char("\uFFFD", out)
+                return 3
+            if b0 == 0xED and b1 >= 0xA0:  # surrogates
+                self._record_span_error(pos, pos + 3, ERR_SURROGATE)
+                self._accept_char("\uFFFD", out)
+                return 3
+            cp = ((b0 & 0x0F) << 12) | ((b1 & 0x3F) << 6) | (b2 & 0x3F)
+            if cp < 0x800 or (0xD800 <= cp <= 0xDFFF) or self._is_noncharacter(cp):
+                kind = (ERR_OVERLONG if cp < 0x800 else
+                        ERR_SURROGATE if 0xD800 <= cp <= 0xDFFF else ERR_NONCHARACTER)
+                self._record_span_error(pos, pos + 3, kind)
+                self._accept_char("\uFFFD", out)
+            else:
+                self._accept_char(chr(cp), out)
+            return 3
+
+        # 4-byte: 11110xxx 10xxxxxx 10xxxxxx 10xxxxxx
+        if 0xF0 <= b0 <= 0xF4:
+            if pos + 3 >= n:
+                return 0  # incomplete
+            b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+            if not (0x80 <= b1 <= 0xBF and 0x80 <= b2 <= 0xBF and 0x80 <= b3 <= 0xBF):
+                self._record_span_error(pos, pos + 1, ERR_TRUNCATED)
+                self._accept_char("\uFFFD", out)
+                return 1
+            # Lead-byte boundary checks to avoid overlongs and >U+10FFFF
+            if b0 == 0xF0 and b1 < 0x90:      # overlong for 4-byte
+                self._record_span_error(pos, pos + 4, ERR_OVERLONG)
+                self._accept_char("\uFFFD", out)
+                return 4
+            if b0 == 0xF4 and b1 > 0x8F:      # beyond U+10FFFF
+                self._record_span_error(pos, pos + 4, ERR_OUT_OF_RANGE)
+                self._accept_char("\uFFFD", out)
+                return 4
+            cp = ((b0 & 0x07) << 18) | ((b1 & 0x3F) << 12) | ((b2 & 0x3F) << 6) | (b3 & 0x3F)
+            if cp < 0x10000 or cp > 0x10FFFF or self._is_noncharacter(cp):
+                kind = (ERR_OVERLONG if cp < 0x10000 else
+                        ERR_OUT_OF_RANGE if cp > 0x10FFFF else ERR_NONCHARACTER)
+                self._record_span_error(pos, pos + 4, kind)
+                self._accept_char("\uFFFD", out)
+            else:
+                self._accept_char(chr(cp), out)
+            return 4
+
+        # 0xF5..0xFF are invalid lead bytes
+        self._record_span_error(pos, pos + 1, ERR_INVALID_LEAD)
+        self._accept_char("\uFFFD", out)
+        return 1
+
+
+    def _accept_span(self, text: str, raw, pos: int, out_parts: list):
+        """
+        Accept a valid span decoded by the C codec from raw == view[pos:...].
+        The codec does not know about noncharacters, so they are located with one
+        regex pass over the raw bytes and turned into U+FFFD + error spans here.
+        """
+        passthrough = isinstance(out_parts, _Utf8Sink)
+        if text.isascii() or not any(hint.search(raw) for hint in _NONCHARACTER_HINTS):
+            self._accept_text(text, out_parts, raw if passthrough else None)
+            return
+        last = 0
+        for match in _NONCHARACTER_BYTES.finditer(raw):
+            start, end = match.span()
+            if start > last:
+                piece = raw[last:start]
+                self._accept_text(str(piece, "utf-8"), out_parts, piece if passthrough else None)
+            self._record_span_error(pos + start, pos + end, ERR_NONCHARACTER)
+            self._accept_text("\uFFFD", out_parts)
+            last = end
+        if not last:
+            self._accept_text(text, out_parts, raw if passthrough else None)
+        elif last < len(raw):
+            piece = raw[last:]
+            self._accept_text(str(piece, "utf-8"), out_parts, piece if passthrough else None)
+
+    def _accept_text(self, text: str, out_parts: list, raw=None):
+        """
+        Incremental NFC stage. Append text to the unstable segment, then find the
+        LAST stable boundary in the window and normalize everything before it in
+        one call; only the tail after the boundary is kept.
+        A boundary sits before a char that can neither reorder nor compose with
+        what precedes it (BOUNDARY in the property table). This keeps cross-chunk NFC
+        for L+V(+T) → precomposed Hangul and for canonical reordering.
+        raw, when given, holds the UTF-8 bytes of text for a _Utf8Sink.
+        """
+        stage1, stage2 = _tables or _load_tables()
+        if raw is not None and self.segment:
+            cp = ord(text[0])
+            if stage2[stage1[cp >> 8] + (cp & 0xFF)] & BOUNDARY:
+                out_parts.append(unicodedata.normalize("NFC", self.segment))
+                self.segment = ""
+            else:
+                raw = None
+        window = self.segment + text if self.segment else text
+        # Boundaries inside the old segment were ruled out by earlier calls.
+        floor = max(len(self.segment), 1)
+        cut = 0
+        for i in range(len(window) - 1, floor - 1, -1):
+            cp = ord(window[i])
+            if stage2[stage1[cp >> 8] + (cp & 0xFF)] & BOUNDARY:
+                cut = i
+                break
+        if not cut:
+            self.segment = window
+            return
+        if raw is not None and (text.isascii() or unicodedata.is_normalized("NFC", text)):
+            # window is text and already NFC: copy its bytes up to the boundary.
+            self.segment = window[cut:]
+            out_parts.append_raw(raw[:len(raw) - len(self.segment.encode("utf-8"))])
+            return
+        head = window[:cut]
+        # normalize() already returns its input when the NFC quick check says YES
+        out_parts.append(head if head.isascii() else unicodedata.normalize("NFC", head))
+        self.segment = window[cut:]
+
+    def _accept_char(self, ch: str, out_parts: list):
+        """
+        _accept_text() for a single char: the only possible boundary is before
+        ch itself, so no window scan or slicing is needed.
+        """
+        stage1, stage2 = _tables or _load_tables()
+        cp = ord(ch)
+        segment = self.segment
+        if segment and stage2[stage1[cp >> 8] + (cp & 0xFF)] & BOUNDARY:
+            out_parts.append(segment if segment.isascii() else unicodedata.normalize("NFC", segment))
+            self.segment = ch
+        else:
+            self.segment = segment + ch
 
     @staticmethod
     def _is_noncharacter(cp: int) -> bool:
-        if 0xFDD0 <= cp <= 0xFDEF:
-            return True
-        return (cp & 0xFFFF) in (0xFFFE, 0xFFFF)
+        stage1, stage2 = _tables or _load_tables()
+        return bool(stage2[stage1[cp >> 8] + (cp & 0xFF)] & NONCHARACTER)
+
+    def _close_run(self, local_end: int = 0):
+        self.errors.add(self.open_run, self.byte_offset + local_end, ERR_STRAY_CONTINUATION)
+        self.open_run = -1
 
     # ---- error recording with global byte coordinates ----
-    def _record_span_error(self, local_start: int, local_end: int):
-        self.errors.append((self.byte_offset + local_start, self.byte_offset + local_end))
\ No newline at end of file
+    def _record_span_error(self, local_start: int, local_end: int, kind: int):
+        self.errors.add(self.byte_offset + local_start, self.byte_offset + local_end, kind)
+
+
+# ---------------- Batch API ----------------
+
+class BatchResult:
+    """
+    Columnar result of normalize_many(..., columnar=True):
+      - text: every normalized message concatenated into one str
+      - offsets: array('Q'), message i is text[offsets[i]:offsets[i + 1]]
+      - spans: array('Q') of flattened (start, end) pairs, message-relative
+      - span_offsets: array('Q'), message i owns pairs span_offsets[i]:span_offsets[i + 1]
+    """
+
+    __slots__ = ("text", "offsets", "spans", "span_offsets")
+
+    def __init__(self, text: str, offsets: array, spans: array, span_offsets: array):
+        self.text = text
+        self.offsets = offsets
+        self.spans = spans
+        self.span_offsets = span_offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int):
+        """(text, errors) of message i, same shape as the row-wise result."""
+        if i < 0:
+            i += len(self)
+        first, last = self.span_offsets[i], self.span_offsets[i + 1]
+        errors = [(self.spans[j], self.spans[j + 1]) for j in range(2 * first, 2 * last, 2)]
+        return self.text[self.offsets[i]:self.offsets[i + 1]], errors
+
+
+def normalize_many(messages, columnar: bool = False):
+    """
+    Normalize many short, independent messages (each one a complete stream).
+    One normalizer is reset between messages instead of constructing a new one,
+    and pure-ASCII messages skip the pipeline entirely (ASCII is already NFC).
+    Returns a list of (text, errors) pairs, or a BatchResult when columnar=True.
+    """
+    normalizer = Utf8StreamNormalizer()
+    rows = []
+    pieces = []
+    offsets = array("Q", [0])
+    spans = array("Q")
+    span_offsets = array("Q", [0])
+    length = 0
+
+    for message in messages:
+        if isinstance(message, (bytes, bytearray)) and message.isascii():
+            text = message.decode("ascii")
+            errors = []
+        else:
+            normalizer.reset()
+            out = []
+            if message:
+                normalizer._feed(message, out)
+            normalizer._finish(out)
+            text = "".join(out)
+            errors = normalizer.errors
+        if not columnar:
+            rows.append((text, errors))
+            continue
+        pieces.append(text)
+        length += len(text)
+        offsets.append(length)
+        for start, end in errors:
+            spans.append(start)
+            spans.append(end)
+        span_offsets.append(len(spans) // 2)
+
+    if not columnar:
+        return rows
+    return BatchResult("".join(pieces), offsets, spans, span_offsets)
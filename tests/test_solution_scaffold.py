@@ -0,0 +1,248 @@
+# Regression tests for the reference scaffold implementation (solution_scaffold.py).
+# The acceptance suite in test_stream_utf8_normalizer.py stays untouched; these
+# cover the fast paths layered on top of it.
+# Run: pytest -q
+
+import importlib
+import io
+import random
+import unicodedata
+
+
+def run_chunks(chunks):
+    mod = importlib.import_module("solution_scaffold")
+    n = mod.Utf8StreamNormalizer()
+    out = []
+    for ch in chunks:
+        out.append(n.push(ch))
+    out.append(n.finish())
+    return "".join(out), n.errors
+
+
+def test_ascii_run_keeps_last_char_for_combining_mark():
+    # "cafe" + COMBINING ACUTE in the next chunk → "café" with precomposed é
+    out, errs = run_chunks([b"cafe", b"\xCC\x81 au lait"])
+    assert out == "café au lait" and errs == []
+
+
+def test_ascii_run_after_hangul_jamo_l():
+    # Jamo L followed by ASCII must not be split from a later V
+    out, errs = run_chunks([b"\xE1\x84\x92abc", b"def"])
+    assert out == "ᄒabcdef" and errs == []
+
+
+def test_ascii_run_error_offsets():
+    out, errs = run_chunks([b"abc\x80de", b"fgh\xC0\xAFij"])
+    assert out == "abc�defgh�ij"
+    assert errs == [(3, 4), (9, 11)]
+
+
+def test_noncharacters_inside_valid_span():
+    # U+FDD0 and U+10FFFF are well-formed UTF-8 but rejected by this task
+    out, errs = run_chunks([b"x\xEF\xB7\x90y\xC3\xA9\xF4\x8F\xBF\xBFz"])
+    assert out == "x�yé�z"
+    assert errs == [(1, 4), (7, 11)]
+
+
+def test_dense_errors_in_long_chunk():
+    # Many malformed bytes in one push exercise the shrinking decode window
+    out, errs = run_chunks([b"ab\xFF" * 500])
+    assert out == "ab�" * 500
+    assert errs == [(3 * i + 2, 3 * i + 3) for i in range(500)]
+
+
+def test_hangul_lv_plus_t_cross_chunk():
+    # 하 U+D558 (LV syllable) + U+11AB (T jamo) → NFC "한" U+D55C
+    out, errs = run_chunks([b"\xED\x95\x98", b"\xE1\x86\xAB"])
+    assert out == "한" and errs == []
+
+
+def test_long_non_starter_run_split_everywhere():
+    # Combining marks arrive one byte at a time; reordering must see them all
+    text = "a" + "̖́" * 20 + "b"
+    chunks = [bytes([b]) for b in text.encode("utf-8")]
+    out, errs = run_chunks(chunks)
+    assert out == unicodedata.normalize("NFC", text) and errs == []
+
+
+def test_short_pushes_match_one_push():
+    # Pushes of a few bytes bypass the C codec; every small chunk size must
+    # still give the output and spans of a single push, into every sink.
+    mod = importlib.import_module("solution_scaffold")
+    pieces = [b"a ", b"\x80", b"\xBF\xBF", b"\xC3\xA9", b"\xE2\x82", b"\xF0\x9F\x98\x80", b"\xED\xA0\x80",
+              b"\xC0\xAF", b"\xFF", b"e\xCC\x81", b"\xE1\x84\x92\xE1\x85\xA1", b"\xE1\x86\xAB", b"\xEF\xB7\x90",
+              b"\xF4\x90\x80\x80", "日本".encode("utf-8")]
+    rng = random.Random(0)
+    for _ in range(300):
+        data = b"".join(rng.choice(pieces) for _ in range(rng.randint(1, 12)))
+        expected = run_chunks([data])
+        for size in range(1, 10):
+            chunks = [data[i:i + size] for i in range(0, len(data), size)]
+            assert run_chunks(chunks) == expected, (data, size)
+            n = mod.Utf8StreamNormalizer()
+            sink = bytearray()
+            for chunk in chunks:
+                n.push_into(chunk, sink)
+            n.finish_into(sink)
+            assert (sink.decode("utf-8"), n.errors) == expected, (data, size)
+
+
+def test_code_point_flags():
+    mod = importlib.import_module("solution_scaffold")
+    assert mod.code_point_flags(ord("a")) == mod.STARTER | mod.BOUNDARY
+    assert mod.code_point_flags(0x0301) == 0  # combining acute: ccc 230
+    assert mod.code_point_flags(0x1112) & mod.JAMO_L
+    assert mod.code_point_flags(0x1161) & mod.JAMO_V
+    assert not mod.code_point_flags(0x1161) & mod.BOUNDARY  # composes with L
+    assert not mod.code_point_flags(0x11AB) & mod.BOUNDARY  # composes with LV
+    assert mod.code_point_flags(0x10FFFF) & mod.NONCHARACTER
+
+
+def test_property_table_disk_cache(tmp_path, monkeypatch):
+    mod = importlib.import_module("solution_scaffold")
+    expected = mod._load_tables()
+    monkeypatch.setenv("UTF8_NORMALIZER_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(mod, "_build_tables", lambda: expected)
+    monkeypatch.setattr(mod, "_tables", None)
+    mod._load_tables()
+    (cached,) = tmp_path.iterdir()
+    assert unicodedata.unidata_version in cached.name
+
+    monkeypatch.setattr(mod, "_tables", None)
+    monkeypatch.setattr(mod, "_build_tables", None)  # must not rebuild
+    assert mod._load_tables() == expected
+
+
+def test_pending_bytes_stay_bounded():
+    mod = importlib.import_module("solution_scaffold")
+    n = mod.Utf8StreamNormalizer()
+    assert n.push(b"ab\xF0\x9F\x98") == "a"
+    assert n.pending == b"\xF0\x9F\x98" and n.byte_offset == 2
+    assert n.push(memoryview(b"\x80cd")) == "b😀c"
+    assert n.pending == b"" and n.byte_offset == 8
+
+
+def test_continuation_run_started_in_pending_bytes():
+    # The run of stray continuation bytes starts in the carried tail and
+    # continues far into the next chunk; it is still ONE span.
+    out, errs = run_chunks([b"\xF0A\x80", b"\x80" * 10, b"z"])
+    assert out == "�A�z"
+    assert errs == [(0, 1), (2, 13)]
+
+
+def test_continuation_run_across_pushes_is_one_span():
+    # A run reaching the end of a push stays open; its span is recorded when
+    # it ends, even after the stored spans were drained or the state restored.
+    mod = importlib.import_module("solution_scaffold")
+    data = b"a" + b"\x80" * 9 + b"b\xBF\xBF"
+    expected = run_chunks([data])
+    assert expected == ("a�b�", [(1, 10), (11, 13)])
+    for size in range(1, 5):
+        n = mod.Utf8StreamNormalizer()
+        out, errors = "", []
+        for i in range(0, len(data), size):
+            out += n.push(data[i:i + size])
+            errors += n.errors
+            del n.errors[:]
+            state = n.snapshot()
+            n = mod.Utf8StreamNormalizer()
+            n.restore(state)
+        out += n.finish()
+        assert (out, errors + list(n.errors)) == expected
+
+
+def test_push_into_text_and_bytes_sinks():
+    mod = importlib.import_module("solution_scaffold")
+    chunks = [b"Cafe\xCC", b"\x81 \xE1\x84\x92", b"\xE1\x85\xA1\xFF ok"]
+    for sink, read in (
+        (io.StringIO(), lambda s: s.getvalue()),
+        (bytearray(), lambda s: s.decode("utf-8")),
+        (io.BytesIO(), lambda s: s.getvalue().decode("utf-8")),
+    ):
+        n = mod.Utf8StreamNormalizer()
+        for ch in chunks:
+            n.push_into(ch, sink)
+        n.finish_into(sink)
+        assert read(sink) == "Café 하� ok"
+        assert n.errors == [(13, 14)]
+
+
+def test_normalize_many_rows_and_columns():
+    mod = importlib.import_module("solution_scaffold")
+    messages = [b"plain ascii", b"e\xCC\x81t\xC3\xA9", b"", b"bad \xC0\xAF", b"\xE2\x82"]
+    expected = [run_chunks([m]) for m in messages]
+    assert mod.normalize_many(messages) == expected
+
+    result = mod.normalize_many(messages, columnar=True)
+    assert len(result) == len(messages)
+    assert result.text == "plain asciiétébad ��"
+    assert [result[i] for i in range(len(result))] == expected
+    assert list(result.span_offsets) == [0, 0, 0, 0, 1, 2]
+
+
+def test_error_store_policies_and_histogram():
+    mod = importlib.import_module("solution_scaffold")
+    # overlong, surrogate, stray continuation run, noncharacter, truncated at end
+    data = b"\xC0\xAF\xED\xA0\x80\x80\x80\xEF\xB7\x90\xE2\x82"
+    spans = [(0, 2), (2, 5), (5, 7), (7, 10), (10, 12)]
+    histogram = {"overlong": 1, "surrogate": 1, "stray_continuation": 1,
+                 "noncharacter": 1, "truncated": 1}
+
+    def run(**policy):
+        n = mod.Utf8StreamNormalizer(**policy)
+        assert n.push(data) + n.finish() == "�" * 5
+        return n.errors
+
+    errs = run()
+    assert errs == spans and errs[1] == (2, 5) and errs[-2:] == spans[-2:]
+    assert errs.histogram() == histogram
+
+    errs = run(error_policy="first", max_errors=2)
+    assert errs == spans[:2] and errs.total == 5
+
+    errs = run(error_policy="count")
+    assert errs == [] and errs.total == 5 and errs.histogram() == histogram
+
+    errs = run(merge_adjacent=True)
+    assert errs == [(0, 12)] and errs.total == 5
+
+    del errs[:]
+    assert errs == [] and errs.total == 5
+
+
+def test_error_kind_codes_and_counters():
+    mod = importlib.import_module("solution_scaffold")
+    n = mod.Utf8StreamNormalizer(error_policy="first", max_errors=3)
+    n.push(b"\xF0\x8F\xBF\xBF ok \xF4\x90\x80\x80\xFF\xED")
+    n.push(b"\xBF\xBF\xE2\x82\x41\xE2")
+    n.finish()
+    assert list(n.errors.records()) == [
+        (0, 4, mod.ERR_OVERLONG),
+        (8, 12, mod.ERR_OUT_OF_RANGE),
+        (12, 13, mod.ERR_INVALID_LEAD),
+    ]
+    counts = dict(zip(mod.ERROR_KINDS, n.error_counts))
+    assert counts == {"overlong": 1, "surrogate": 1, "noncharacter": 0, "truncated": 2,
+                      "stray_continuation": 1, "invalid_lead": 1, "out_of_range": 1}
+    del n.errors[:]
+    assert sum(n.error_counts) == 7
+
+
+def test_snapshot_restore_resumes_stream():
+    mod = importlib.import_module("solution_scaffold")
+    data = "Café 학 ".encode("utf-8") + b"\xC0\xAF\xF0\x9F\x98\x80 \xE2\x82"
+    expected = run_chunks([data])
+    for cut in range(len(data) + 1):
+        first = mod.Utf8StreamNormalizer()
+        out = first.push(data[:cut])
+        errors = list(first.errors)
+        state = first.snapshot()
+        assert len(state) < 128
+
+        second = mod.Utf8StreamNormalizer()
+        second.restore(state)
+        resume = second.byte_offset + len(second.pending)
+        assert resume == cut
+        out += second.push(data[resume:]) + second.finish()
+        assert (out, errors + list(second.errors)) == expected
+        assert second.errors.total == len(expected[1])